@@ -0,0 +1,8 @@
+"""Entry point of the command line, run as `python -m src`."""
+
+import sys
+
+from src.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""This module benchmarks the executors on synthetic ledgers."""
+
+import argparse
+import datetime
+import inspect
+import json
+import logging
+import platform
+import random
+import time
+import tracemalloc
+from typing import Optional
+
+from src.data_loader import AbstractDataLoader, Summons
+from src.executor import (
+    AbstractExecutor,
+    Budget,
+    SequentialExecutor,
+    Status,
+)
+
+_logger = logging.getLogger(__name__)
+
+# Amounts of vouchers that appear again and again in a real ledger.
+COMMON_AMOUNTS = (500, 1000, 2000, 3000, 5000, 10000)
+DEFAULT_SIZES = (10, 16, 22)
+DEFAULT_SUBSET_SIZES = (2, 4)
+DEFAULT_TARGET_SECONDS = 10.0
+
+
+class SyntheticDataLoader(AbstractDataLoader):
+    """
+    A data loader that generates a random ledger.
+
+    The amounts are multiples of 10 drawn from a log-normal
+    distribution, and a `duplication` share of them is one of
+    COMMON_AMOUNTS instead. Every solvable target is the sum of
+    `subset_size` numbers that no other target uses, dated on the last
+    of their dates. Every unsolvable target is such a sum plus 5, which
+    no multiple of 10 can reach. The same seed always generates the
+    same ledger.
+
+    Attributes:
+        size: The number of numbers.
+        subset_size: The number of numbers of each solvable target.
+        solvable: The number of solvable targets.
+        unsolvable: The number of unsolvable targets.
+        duplication: The share of numbers with a common amount.
+        days: The number of days the dates spread over.
+        seed: The seed of the random generator.
+    """
+
+    def __init__(
+        self,
+        size: int = 20,
+        subset_size: int = 3,
+        solvable: int = 2,
+        unsolvable: int = 1,
+        duplication: float = 0.2,
+        days: int = 30,
+        seed: int = 0,
+    ):
+        super().__init__()
+        if solvable * subset_size > size:
+            raise ValueError(
+                f"{size} numbers cannot cover {solvable} targets of "
+                f"{subset_size} numbers each."
+            )
+        self.size = size
+        self.subset_size = subset_size
+        self.solvable = solvable
+        self.unsolvable = unsolvable
+        self.duplication = duplication
+        self.days = days
+        self.seed = seed
+        self.load()
+
+    def _amount(self, rng: random.Random) -> int:
+        """Draw the amount of a number."""
+        if rng.random() < self.duplication:
+            return rng.choice(COMMON_AMOUNTS)
+        return max(int(round(rng.lognormvariate(7.5, 1.2), -1)), 10)
+
+    def load(self, *args, **kwargs):
+        """Generate the ledger."""
+        rng = random.Random(self.seed)
+        start = datetime.date(2024, 1, 1)
+        self.numbers = []
+        for i in range(self.size):
+            date = start + datetime.timedelta(days=rng.randrange(self.days))
+            account = f"{date:%Y%m%d}-5256-{i:06d}"
+            self.numbers.append(Summons(account, date, self._amount(rng)))
+        picked = rng.sample(self.numbers, self.solvable * self.subset_size)
+        self.targets = []
+        for i in range(self.solvable):
+            subset = picked[i * self.subset_size : (i + 1) * self.subset_size]
+            date = max(number.date for number in subset)
+            amount = sum(number.amount for number in subset)
+            account = f"{date:%Y%m%d}-5259-{i:06d}"
+            self.targets.append(Summons(account, date, amount))
+        for i in range(self.solvable, self.solvable + self.unsolvable):
+            subset = rng.sample(self.numbers, self.subset_size)
+            date = max(number.date for number in subset)
+            amount = sum(number.amount for number in subset) + 5
+            account = f"{date:%Y%m%d}-5259-{i:06d}"
+            self.targets.append(Summons(account, date, amount))
+        self._loaded = True
+        self.sort()
+
+
+def executor_classes() -> list[type[AbstractExecutor]]:
+    """Find every concrete executor defined in src.executor.
+
+    Subclasses defined elsewhere, such as the fakes of the tests, are
+    left out.
+    """
+    found = []
+    classes = [AbstractExecutor]
+    while classes:
+        cls = classes.pop(0)
+        classes.extend(cls.__subclasses__())
+        if (
+            not inspect.isabstract(cls)
+            and cls.__module__ == AbstractExecutor.__module__
+            and cls not in found
+        ):
+            found.append(cls)
+    return found
+
+
+def measure(
+    executor: AbstractExecutor, data_loader: AbstractDataLoader
+) -> dict:
+    """Run an executor once and measure it.
+
+    The peak memory is traced by tracemalloc, which slows down the run
+    as well. The wall time is therefore only comparable to other runs
+    of this function.
+    """
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        results = executor.calculate_all(
+            data_loader.targets, data_loader.numbers
+        )
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    record = {
+        "seconds": seconds,
+        "work": executor.work,
+        "peak_bytes": peak,
+        "correct": all(
+            sum(number.amount for number in result.subset)
+            == result.target.amount
+            for result in results
+            if result.subset
+        ),
+    }
+    for status in Status:
+        record[status.value] = sum(1 for i in results if i.status is status)
+    return record
+
+
+def run_benchmark(
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    subset_sizes: tuple[int, ...] = DEFAULT_SUBSET_SIZES,
+    seed: int = 0,
+    budget: Optional[Budget] = None,
+    executors: Optional[list[type[AbstractExecutor]]] = None,
+    output: Optional[str] = "benchmark.json",
+) -> dict:
+    """Run every executor over a grid of ledgers.
+
+    Parameters:
+        sizes: The numbers of numbers of the ledgers.
+        subset_sizes: The numbers of numbers of each solvable target.
+        seed: The seed of every ledger of the grid.
+        budget: The budget of every target of the executors that solve
+            the targets one after another, so slow executors cannot
+            hold up the benchmark.
+        executors: The executors to benchmark, or all if None.
+        output: The path of the JSON results file, or None to write
+            nothing.
+
+    Returns the benchmark, which is also written to output.
+    """
+    executors = executors or executor_classes()
+    records = []
+    for size in sizes:
+        for subset_size in subset_sizes:
+            data_loader = SyntheticDataLoader(
+                size=size, subset_size=subset_size, seed=seed
+            )
+            for executor_class in executors:
+                try:
+                    if issubclass(executor_class, SequentialExecutor):
+                        executor = executor_class(budget=budget)
+                    else:
+                        executor = executor_class()
+                except ImportError as e:
+                    _logger.warning(f"Skipped {executor_class.__name__}: {e}")
+                    continue
+                record = {
+                    "executor": executor_class.__name__,
+                    "size": size,
+                    "subset_size": subset_size,
+                }
+                record.update(measure(executor, data_loader))
+                _logger.info(f"Benchmark: {record}")
+                records.append(record)
+    benchmark = {
+        "seed": seed,
+        "budget": budget and vars(budget),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": records,
+    }
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(benchmark, file, indent=2)
+    return benchmark
+
+
+def main(argv: Optional[list[str]] = None):
+    """Parse the command line and run the benchmark."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.benchmark",
+        description="Benchmark the executors on synthetic ledgers.",
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES)
+    )
+    parser.add_argument(
+        "--subset-sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SUBSET_SIZES),
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--target-seconds",
+        type=float,
+        default=DEFAULT_TARGET_SECONDS,
+        help="give up a target after this many seconds",
+    )
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    args = parser.parse_args(argv)
+    run_benchmark(
+        tuple(args.sizes),
+        tuple(args.subset_sizes),
+        args.seed,
+        Budget(seconds=args.target_seconds),
+        output=args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
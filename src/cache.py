@@ -0,0 +1,258 @@
+"""This module provides a persistent cache of solved targets."""
+
+import datetime
+import hashlib
+import json
+import sqlite3
+from bisect import bisect_right
+from contextlib import closing
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.data_loader import Summons
+from src.executor import AbstractExecutor, DateWindow, Result
+from src.subprocess import AbstractSubprocessManager
+
+DEFAULT_CACHE_PATH = Path.home() / ".sum" / "cache.sqlite3"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# A counter that orders the entries from the least recently used.
+_NEXT_USE = "(SELECT COALESCE(MAX(used), 0) + 1 FROM results)"
+
+
+def cache_key(
+    executor: AbstractExecutor,
+    target: Summons,
+    amounts: list[int],
+    window: Optional[DateWindow] = None,
+) -> str:
+    """Compute the cache key of a target.
+
+    Parameters:
+        executor: The executor that solves the target.
+        target: The target that we want to solve.
+        amounts: The sorted amounts of the numbers that target may be
+            matched to. Only the amounts that are not larger than
+            target are hashed, because the others can never be part of
+            its subset.
+        window: The date window of the executor, if any.
+    """
+    candidates = amounts[: bisect_right(amounts, target.amount)]
+    digest = hashlib.sha256()
+    digest.update(type(executor).__name__.encode())
+    if window is not None:
+        digest.update(f"|{window.before},{window.after}".encode())
+    digest.update(f"|{target.amount}|".encode())
+    digest.update(",".join(map(str, candidates)).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    An on-disk cache of the subsets of solved targets.
+
+    The subsets are stored as their amounts in SQLite. Once the stored
+    subsets exceed `max_bytes`, the least recently used ones are
+    evicted.
+
+    Attributes:
+        path: The path of the SQLite database.
+        max_bytes: The maximum size of the stored subsets.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, subset TEXT NOT NULL, "
+                "size INTEGER NOT NULL, used INTEGER NOT NULL)"
+            )
+
+    def _connect(self) -> closing[sqlite3.Connection]:
+        """Open a connection that is closed once the block exits."""
+        return closing(sqlite3.connect(self.path))
+
+    def get(self, key: str) -> Optional[list[int]]:
+        """Return the amounts of a cached subset, or None on a miss."""
+        with self._connect() as connection, connection:
+            row = connection.execute(
+                "SELECT subset FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                f"UPDATE results SET used = {_NEXT_USE} WHERE key = ?",
+                (key,),
+            )
+        return json.loads(row[0])
+
+    def put(self, key: str, amounts: list[int]):
+        """Store the amounts of a subset and evict old entries."""
+        subset = json.dumps(amounts)
+        with self._connect() as connection, connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO results "
+                f"VALUES (?, ?, ?, {_NEXT_USE})",
+                (key, subset, len(subset)),
+            )
+            (total,) = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            rows = connection.execute(
+                "SELECT key, size FROM results ORDER BY used"
+            )
+            evicted = []
+            for old_key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                evicted.append((old_key,))
+                total -= size
+            connection.executemany(
+                "DELETE FROM results WHERE key = ?", evicted
+            )
+
+
+class CachedSubprocessManager(AbstractSubprocessManager):
+    """
+    Subprocess manager that answers solved targets from a ResultCache.
+
+    Cached subsets are matched to unclaimed summons of the same amounts.
+    If the executor has a date window, only the summons within the
+    window of a target are hashed into its key and matched to it.
+    Only the remaining targets are sent to the wrapped manager, and the
+    subsets it finds are stored for the next run. Targets without
+    subset are not cached, because the executor may have missed them
+    only because earlier targets took their summons.
+
+    Attributes:
+        manager: The manager that solves the targets missing in cache.
+        cache: The cache of solved targets.
+    """
+
+    def __init__(self, manager: AbstractSubprocessManager, cache: ResultCache):
+        self.manager = manager
+        self.cache = cache
+
+    def is_running(self):
+        """Check if the subprocess is running."""
+        return self.manager.is_running()
+
+    def terminate(self):
+        """Terminate the subprocess."""
+        self.manager.terminate()
+
+    def start_calculation(
+        self,
+        executor: AbstractExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        callback: Callable[[list[Result]], None] = lambda x: None,
+        error_callback: Callable[[Exception], None] = lambda x: None,
+        interval: float = 1.0,
+    ):
+        """Answer cached targets and start the calculation of others."""
+        window = getattr(executor, "window", None)
+        bounds = [window and window.bounds(i.date) for i in targets]
+        amounts = sorted(i.amount for i in numbers)
+        keys = []
+        for target, bound in zip(targets, bounds):
+            candidates = amounts
+            if bound is not None:
+                candidates = sorted(
+                    i.amount for i in numbers if bound[0] <= i.date <= bound[1]
+                )
+            keys.append(cache_key(executor, target, candidates, window))
+        by_amount: dict[int, list[Summons]] = {}
+        for number in numbers:
+            by_amount.setdefault(number.amount, []).append(number)
+        results: list[Optional[Result]] = [None] * len(targets)
+        claimed = set()
+        for idx, target in enumerate(targets):
+            subset = self.cache.get(keys[idx])
+            if subset is None:
+                continue
+            subset = self._claim(subset, by_amount, bounds[idx])
+            if subset is None:
+                continue
+            results[idx] = Result(target, subset)
+            claimed.update(map(id, subset))
+        misses = [idx for idx, result in enumerate(results) if not result]
+
+        def done(outcome: list[Result]):
+            for idx, result in zip(misses, outcome, strict=True):
+                results[idx] = result
+                if result.subset:
+                    self.cache.put(
+                        keys[idx], [i.amount for i in result.subset]
+                    )
+            callback(results)
+
+        # Even without misses, the wrapped manager is asked, so that
+        # the callback runs as asynchronously as ever.
+        self.manager.start_calculation(
+            executor,
+            [targets[idx] for idx in misses],
+            [i for i in numbers if id(i) not in claimed],
+            done,
+            error_callback,
+            interval,
+        )
+
+    @staticmethod
+    def _claim(
+        subset: list[int],
+        by_amount: dict[int, list[Summons]],
+        bounds: Optional[tuple[datetime.date, ...]] = None,
+    ) -> Optional[list[Summons]]:
+        """Take unclaimed summons of the amounts of subset.
+
+        Only summons dated within bounds are taken, if given. Returns
+        None and takes nothing if the summons cannot cover subset.
+        """
+        taken = []
+        chosen = set()
+        for amount in subset:
+            number = next(
+                (
+                    i
+                    for i in by_amount.get(amount, [])
+                    if id(i) not in chosen
+                    and (bounds is None or bounds[0] <= i.date <= bounds[1])
+                ),
+                None,
+            )
+            if number is None:
+                return None
+            taken.append(number)
+            chosen.add(id(number))
+        for amount in set(subset):
+            by_amount[amount] = [
+                i for i in by_amount[amount] if id(i) not in chosen
+            ]
+        return taken
+
+    def start_enumeration(self, *args, **kwargs):
+        """Start writing every match of the targets in a subprocess.
+
+        Matches are not cached, since a cached subset is only one of
+        them.
+        """
+        self.manager.start_enumeration(*args, **kwargs)
+
+    def open_workbook(self, path: str):
+        """Tell the wrapped manager which workbook is calculated."""
+        self.manager.open_workbook(path)
+
+    def stop_calculation(self):
+        """Stop the calculation and renew resources."""
+        self.manager.stop_calculation()
+
+    def update_status(self):
+        """Update the status of the calculation."""
+        return self.manager.update_status()
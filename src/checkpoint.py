@@ -0,0 +1,73 @@
+"""This module persists the state of searches so they can be resumed."""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_CHECKPOINT_PATH = Path.home() / ".sum" / "checkpoint.pickle"
+DEFAULT_CHECKPOINT_INTERVAL = 30.0
+
+
+def ledger_key(*parts) -> str:
+    """Hash the parts that identify a calculation of a ledger.
+
+    The parts must have a deterministic repr, such as lists of Summons.
+    """
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def save_atomically(path: Path, data: object):
+    """Pickle data to path, replacing the file in one step.
+
+    The data is written to a temporary file first, so an interrupted
+    save never corrupts the previous file.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as file:
+        pickle.dump(data, file)
+    os.replace(temporary, path)
+
+
+class CheckpointStore:
+    """
+    A local file that holds the checkpoint of one calculation.
+
+    The checkpoint is a dictionary that is pickled together with the
+    key of the calculation it belongs to, so a checkpoint of another
+    ledger is never resumed.
+
+    Attributes:
+        path: The path of the checkpoint file.
+        interval: The minimum number of seconds between two saves.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CHECKPOINT_PATH,
+        interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+    ):
+        self.path = Path(path)
+        self.interval = interval
+
+    def load(self, key: str) -> Optional[dict]:
+        """Return the checkpoint of the calculation, if there is one."""
+        try:
+            with open(self.path, "rb") as file:
+                saved_key, state = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        return state if saved_key == key else None
+
+    def save(self, key: str, state: dict):
+        """Replace the checkpoint with the state of the calculation.
+
+        See save_atomically.
+        """
+        save_atomically(self.path, (key, state))
+
+    def clear(self):
+        """Remove the checkpoint."""
+        self.path.unlink(missing_ok=True)
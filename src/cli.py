@@ -0,0 +1,456 @@
+"""This module runs the calculation of workbooks without the GUI."""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from pathlib import Path
+from typing import Optional, TextIO
+
+from src.data_loader import ExcelDataLoader
+from src.executor import (
+    TARGET_ORDERS,
+    AbstractExecutor,
+    BitsetExecutor,
+    BranchAndBoundExecutor,
+    BruteForceExecutor,
+    Budget,
+    DateWindow,
+    DynamicProgrammingExecutor,
+    MeetInTheMiddleExecutor,
+    PlannedExecutor,
+    SequentialExecutor,
+    Status,
+    VectorizedExecutor,
+)
+from src.output import output_excel, stream_output_excel
+
+_logger = logging.getLogger(__name__)
+
+EXECUTORS: dict[str, type[AbstractExecutor]] = {
+    "bitset": BitsetExecutor,
+    "branch-and-bound": BranchAndBoundExecutor,
+    "brute-force": BruteForceExecutor,
+    "dynamic-programming": DynamicProgrammingExecutor,
+    "meet-in-the-middle": MeetInTheMiddleExecutor,
+    "planned": PlannedExecutor,
+    "vectorized": VectorizedExecutor,
+}
+# The layouts of the output workbook. "wide" puts every target in a
+# block of columns, and "rows" writes a row per matched summons in
+# write-only mode, which is faster for large ledgers.
+LAYOUTS = {"wide": output_excel, "rows": stream_output_excel}
+# The number of seconds between two polls of the running workbooks.
+_POLL_INTERVAL = 0.1
+
+
+def _run_file(
+    executor_name: str,
+    queue: multiprocessing.Queue,
+    index: int,
+    filename: str,
+    output: str,
+    interval: float = 1.0,
+    budget: Optional[Budget] = None,
+    layout: str = "wide",
+    window: Optional[DateWindow] = None,
+    order: str = "date",
+) -> dict:
+    """Load, calculate and output one workbook. Use as a child process.
+
+    Parameters:
+        executor_name: The key of the executor in EXECUTORS.
+        queue: The queue that receives the events of the workbook.
+        index: The position of the workbook in the batch, which tells
+            apart the events of a workbook given twice.
+        filename: The path of the workbook.
+        output: The path of the output workbook.
+        interval: The minimum number of seconds between two progress
+            reports.
+        budget: The budget of every target, if the executor solves
+            the targets one after another.
+        layout: The key of the layout of the output in LAYOUTS.
+        window: The date window of every target, if the executor
+            solves the targets one after another.
+        order: The key of the order of the targets in TARGET_ORDERS,
+            if the executor solves the targets one after another.
+
+    Returns the "done" event of the workbook.
+    """
+    start = time.time()
+    queue.put(
+        {"event": "start", "index": index, "file": filename, "time": start}
+    )
+    data_loader = ExcelDataLoader()
+    data_loader.load(filename)
+    loaded = time.time()
+    last_report = loaded
+
+    def callback(progress: float):
+        nonlocal last_report
+        if time.time() - last_report > interval:
+            queue.put(
+                {
+                    "event": "progress",
+                    "index": index,
+                    "file": filename,
+                    "progress": progress,
+                }
+            )
+            last_report = time.time()
+
+    executor_class = EXECUTORS[executor_name]
+    if issubclass(executor_class, SequentialExecutor):
+        executor = executor_class(order=order, window=window, budget=budget)
+    else:
+        executor = executor_class()
+    results = executor.calculate_all(
+        data_loader.targets, data_loader.numbers, callback
+    )
+    calculated = time.time()
+    LAYOUTS[layout](results, data_loader, output)
+    end = time.time()
+    return {
+        "event": "done",
+        "index": index,
+        "file": filename,
+        "output": output,
+        "targets": len(results),
+        **{
+            status.value: sum(1 for i in results if i.status is status)
+            for status in Status
+        },
+        "load_seconds": loaded - start,
+        "calculate_seconds": calculated - loaded,
+        "output_seconds": end - calculated,
+        "seconds": end - start,
+    }
+
+
+def _run_process(
+    executor_name: str,
+    queue: multiprocessing.Queue,
+    index: int,
+    filename: str,
+    output: str,
+    interval: float = 1.0,
+    budget: Optional[Budget] = None,
+    layout: str = "wide",
+    window: Optional[DateWindow] = None,
+    order: str = "date",
+):
+    """Run _run_file and put its "done" or "error" event to queue.
+
+    Use as the target of the process of a workbook.
+    """
+    try:
+        event = _run_file(
+            executor_name,
+            queue,
+            index,
+            filename,
+            output,
+            interval,
+            budget,
+            layout,
+            window,
+            order,
+        )
+    except Exception as e:
+        _logger.exception(f"Failed to calculate {filename}")
+        event = {
+            "event": "error",
+            "index": index,
+            "file": filename,
+            "error": repr(e),
+        }
+    queue.put(event)
+
+
+def _output_names(files: list[str]) -> list[str]:
+    """Name the output workbook of every input workbook.
+
+    The output is named after the stem of the input. Inputs that share
+    a stem, such as the same workbook given twice or workbooks of the
+    same name in different directories, are told apart by their
+    position in files, so that no output overwrites another.
+    """
+    stems = [Path(filename).stem for filename in files]
+    return [
+        f"{stem}-result.xlsx"
+        if stems.count(stem) == 1
+        else f"{stem}-{index}-result.xlsx"
+        for index, stem in enumerate(stems)
+    ]
+
+
+def _emit(stream: TextIO, event: dict):
+    """Write an event as one line of JSON."""
+    stream.write(json.dumps(event, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def run_batch(
+    files: list[str],
+    executor_name: str = "planned",
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    output_dir: str = ".",
+    interval: float = 1.0,
+    budget: Optional[Budget] = None,
+    stream: Optional[TextIO] = None,
+    layout: str = "wide",
+    window: Optional[DateWindow] = None,
+    order: str = "date",
+) -> bool:
+    """Calculate the workbooks in parallel and report every event.
+
+    Every event is written to stream as a line of JSON with an "event"
+    key, which is one of "start", "progress", "done", "error",
+    "timeout" and finally "summary". The events of a workbook carry
+    its "file" and its "index" in files. The output of a workbook is
+    named after its stem, with its index added if another workbook
+    shares the stem.
+
+    Parameters:
+        files: The paths of the workbooks.
+        executor_name: The key of the executor in EXECUTORS.
+        workers: The number of workbooks calculated at once, or all
+            cores if None.
+        timeout: The maximum number of seconds a workbook may run, or
+            None for no limit. A workbook starts counting once a
+            process picks it up.
+        output_dir: The directory of the output workbooks.
+        interval: The minimum number of seconds between two progress
+            reports of a workbook.
+        budget: The budget of every target. Only executors that solve
+            the targets one after another support it.
+        stream: The stream that receives the events, or stdout if
+            None.
+        layout: The key of the layout of the outputs in LAYOUTS.
+        window: The date window of every target. Only executors that
+            solve the targets one after another support it.
+        order: The key of the order of the targets in TARGET_ORDERS.
+            Only executors that solve the targets one after another
+            support it.
+
+    Returns True if every workbook is done.
+    """
+    stream = stream or sys.stdout
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    begin = time.time()
+    status: dict[int, str] = {}
+    outputs = _output_names(files)
+    with multiprocessing.Manager() as manager:
+        events = manager.Queue()
+        # The workbooks are kept by their index in files, since the
+        # same path may be given more than once.
+        waiting = list(range(len(files)))
+        # Every workbook runs in its own process, so a workbook that
+        # times out can be killed without holding up the others.
+        running: dict[int, multiprocessing.Process] = {}
+        started: dict[int, float] = {}
+        while waiting or running:
+            while waiting and len(running) < workers:
+                index = waiting.pop(0)
+                running[index] = multiprocessing.Process(
+                    target=_run_process,
+                    args=(
+                        executor_name,
+                        events,
+                        index,
+                        files[index],
+                        str(directory / outputs[index]),
+                        interval,
+                        budget,
+                        layout,
+                        window,
+                        order,
+                    ),
+                    daemon=True,
+                )
+                running[index].start()
+            # A process that exits has put all its events before.
+            exited = [
+                index
+                for index, process in running.items()
+                if not process.is_alive()
+            ]
+            while True:
+                try:
+                    event = events.get_nowait()
+                except queue.Empty:
+                    break
+                if event["index"] not in running:
+                    continue
+                if event["event"] == "start":
+                    started[event["index"]] = time.time()
+                elif event["event"] in ("done", "error"):
+                    status[event["index"]] = event["event"]
+                _emit(stream, event)
+            for index, process in list(running.items()):
+                if index in status:
+                    process.join()
+                    del running[index]
+                elif index in exited:
+                    del running[index]
+                    status[index] = "error"
+                    _emit(
+                        stream,
+                        {
+                            "event": "error",
+                            "index": index,
+                            "file": files[index],
+                            "error": f"Exit code {process.exitcode}",
+                        },
+                    )
+                elif (
+                    timeout is not None
+                    and index in started
+                    and time.time() - started[index] > timeout
+                ):
+                    process.kill()
+                    process.join()
+                    del running[index]
+                    status[index] = "timeout"
+                    _emit(
+                        stream,
+                        {
+                            "event": "timeout",
+                            "index": index,
+                            "file": files[index],
+                            "seconds": timeout,
+                        },
+                    )
+            time.sleep(_POLL_INTERVAL if running else 0)
+    summary = {"event": "summary", "seconds": time.time() - begin}
+    for key in ("done", "error", "timeout"):
+        summary[key] = list(status.values()).count(key)
+    _emit(stream, summary)
+    return summary["done"] == len(files)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Parse the command line and calculate the workbooks."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Match the targets of workbooks without the GUI.",
+    )
+    parser.add_argument("files", nargs="+", help="the input workbooks")
+    parser.add_argument(
+        "-e",
+        "--executor",
+        choices=sorted(EXECUTORS),
+        default="planned",
+        help="the algorithm that solves the targets",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="the number of processes (default: all cores)",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=None,
+        help="the maximum number of seconds of a workbook",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=".",
+        help="the directory of the output workbooks",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        default=1.0,
+        help="the minimum number of seconds between progress reports",
+    )
+    parser.add_argument(
+        "-l",
+        "--layout",
+        choices=sorted(LAYOUTS),
+        default="wide",
+        help="the layout of the output workbooks; rows is faster for "
+        "large ledgers",
+    )
+    parser.add_argument(
+        "--target-seconds",
+        type=float,
+        default=None,
+        help="give up a target after this many seconds",
+    )
+    parser.add_argument(
+        "--target-work",
+        type=int,
+        default=None,
+        help="give up a target after this many units of work, e.g. "
+        "combinations or nodes",
+    )
+    parser.add_argument(
+        "--window-before",
+        type=int,
+        default=None,
+        help="only match a target to summons at most this many days "
+        "before it",
+    )
+    parser.add_argument(
+        "--window-after",
+        type=int,
+        default=None,
+        help="only match a target to summons at most this many days "
+        "after it",
+    )
+    parser.add_argument(
+        "--order",
+        choices=sorted(TARGET_ORDERS),
+        default="date",
+        help="the order in which the targets claim summons; difficulty "
+        "solves the targets with the fewest candidates first",
+    )
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    window = None
+    if args.window_before is not None or args.window_after is not None:
+        if not issubclass(EXECUTORS[args.executor], SequentialExecutor):
+            parser.error(
+                f"--window-before and --window-after are not supported "
+                f"by the {args.executor} executor"
+            )
+        window = DateWindow(args.window_before or 0, args.window_after or 0)
+        if window.before < 0 or window.after < 0:
+            parser.error("the date window must not be negative")
+    if args.order != "date" and not issubclass(
+        EXECUTORS[args.executor], SequentialExecutor
+    ):
+        parser.error(
+            f"--order is not supported by the {args.executor} executor"
+        )
+    budget = None
+    if args.target_seconds is not None or args.target_work is not None:
+        budget = Budget(args.target_seconds, args.target_work)
+    done = run_batch(
+        args.files,
+        args.executor,
+        args.workers,
+        args.timeout,
+        args.output_dir,
+        args.interval,
+        budget,
+        layout=args.layout,
+        window=window,
+        order=args.order,
+    )
+    return 0 if done else 1
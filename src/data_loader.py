@@ -2,12 +2,13 @@
 
 import datetime
 from abc import ABC, abstractmethod
+from collections import Counter
 from dataclasses import dataclass
 
 import openpyxl
 
 
-@dataclass
+@dataclass(slots=True)
 class Summons:
     """
     An Accounting summons.
@@ -75,27 +76,35 @@ class ExcelDataLoader(AbstractDataLoader):
         """
         if self.loaded and not reload:
             return
-        workbook = openpyxl.load_workbook(filename)
-        sheet = workbook[workbook.sheetnames[0]]
-        targets = [
-            row[0] for row in sheet.iter_rows(values_only=True) if row[0]
-        ]
-        self.targets = []
-        self.numbers = []
-        sheet = workbook[workbook.sheetnames[1]]
-        for row in sheet.iter_rows(values_only=True):
-            tag = row[0]
-            if not tag:
-                break
-            date_str = tag.split("-")[0]
-            formatted_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
-            date = datetime.date.fromisoformat(formatted_str)
-            amount = abs(row[1])
-            obj = Summons(tag, date, amount)
-            if amount in targets:
-                self.targets.append(obj)
-                targets.remove(amount)
-            else:
-                self.numbers.append(obj)
+        # Stream the rows instead of building every cell object.
+        workbook = openpyxl.load_workbook(filename, read_only=True)
+        try:
+            sheet = workbook[workbook.sheetnames[0]]
+            targets = Counter(
+                row[0]
+                for row in sheet.iter_rows(max_col=1, values_only=True)
+                if row[0]
+            )
+            self.targets = []
+            self.numbers = []
+            sheet = workbook[workbook.sheetnames[1]]
+            for row in sheet.iter_rows(max_col=2, values_only=True):
+                tag = row[0]
+                if not tag:
+                    break
+                date_str = tag.split("-")[0]
+                formatted_str = (
+                    f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
+                )
+                date = datetime.date.fromisoformat(formatted_str)
+                amount = abs(row[1])
+                obj = Summons(tag, date, amount)
+                if targets[amount] > 0:
+                    self.targets.append(obj)
+                    targets[amount] -= 1
+                else:
+                    self.numbers.append(obj)
+        finally:
+            workbook.close()
         self._loaded = True
         self.sort()
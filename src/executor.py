@@ -1,13 +1,26 @@
 """This module contains executors that solve problems."""
 
+import datetime
 import logging
+import os
 import time
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from collections import Counter
 from dataclasses import dataclass
-from itertools import combinations
-from typing import Callable, Optional
+from enum import Enum
+from itertools import combinations, islice
+from math import comb, prod
+from typing import Callable, Iterable, Iterator, Optional
 
+from src.checkpoint import CheckpointStore, ledger_key
 from src.data_loader import Summons
+from src.ledger import CompactLedger
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed by VectorizedExecutor.
+    np = None
 
 _logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -17,6 +30,15 @@ logging.basicConfig(
 )
 
 DEFAULT_INTERVAL = 3
+PROGRESS_BATCH = 4096
+
+
+class Status(Enum):
+    """The outcome of the search of a target."""
+
+    SOLVED = "solved"
+    IMPOSSIBLE = "impossible"
+    EXHAUSTED = "exhausted"
 
 
 @dataclass
@@ -29,10 +51,171 @@ class Result:
         subset: The subset of Summons that
             sums up to the target. If no such subset exists, it is
             None.
+        status: Whether the target is solved, proven impossible or
+            given up because its budget is exhausted. Derived from
+            subset if not given.
+        reason: Why the target is not solved, if known.
     """
 
     target: Summons
     subset: Optional[list[Summons]]
+    status: Optional[Status] = None
+    reason: str = ""
+
+    def __post_init__(self):
+        if self.status is None:
+            self.status = Status.SOLVED if self.subset else Status.IMPOSSIBLE
+
+
+@dataclass
+class Budget:
+    """
+    The limits of the search of a single target.
+
+    The limits are checked whenever progress is reported, which is
+    once per PROGRESS_BATCH units of work, so a search may overrun them
+    by up to one batch.
+
+    Attributes:
+        seconds: The wall-clock seconds of the search, or None for no
+            limit.
+        work: The units of work of the search, or None for no limit.
+            The unit depends on the executor, e.g. combinations for
+            BruteForceExecutor and nodes for BranchAndBoundExecutor.
+    """
+
+    seconds: Optional[float] = None
+    work: Optional[int] = None
+
+    def exceeded(self, seconds: float, work: int) -> Optional[str]:
+        """Return why the budget is exceeded, or None if it is not."""
+        if self.seconds is not None and seconds > self.seconds:
+            return f"time budget of {self.seconds} seconds exhausted"
+        if self.work is not None and work > self.work:
+            return f"work budget of {self.work} exhausted"
+        return None
+
+
+class _BudgetExhausted(Exception):
+    """Raised inside a search to abandon a target over budget."""
+
+
+@dataclass
+class DateWindow:
+    """
+    The dates of the summons that a target may be matched to.
+
+    Attributes:
+        before: The number of days before the date of target.
+        after: The number of days after the date of target.
+    """
+
+    before: int = 0
+    after: int = 0
+
+    def bounds(self, date: datetime.date) -> tuple[datetime.date, ...]:
+        """Return the first and the last date of the window."""
+        return (
+            date - datetime.timedelta(days=self.before),
+            date + datetime.timedelta(days=self.after),
+        )
+
+
+class CandidatePool:
+    """
+    The numbers that are not matched to any target yet.
+
+    A flag per number marks whether it is still available, so that the
+    summons of a matched target are removed in O(1) each and later
+    targets search a smaller space. The numbers are also indexed by
+    date, so that the numbers of a date window are found by bisection.
+
+    Attributes:
+        numbers: All numbers of the pool, including removed ones.
+    """
+
+    def __init__(self, numbers: Iterable[Summons]):
+        self.numbers = list(numbers)
+        self._index = {id(number): i for i, number in enumerate(self.numbers)}
+        self._available = bytearray(b"\x01") * len(self.numbers)
+        self._size = len(self.numbers)
+        self._by_date = sorted(
+            range(len(self.numbers)), key=lambda i: self.numbers[i].date
+        )
+        self._dates = [self.numbers[i].date for i in self._by_date]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Summons]:
+        available = self._available
+        return (n for i, n in enumerate(self.numbers) if available[i])
+
+    def between(
+        self, start: datetime.date, end: datetime.date
+    ) -> list[Summons]:
+        """Return the available numbers dated from start to end.
+
+        The numbers keep the order in which they were given to the
+        pool.
+        """
+        lo = bisect_left(self._dates, start)
+        hi = bisect_right(self._dates, end)
+        available = self._available
+        return [
+            self.numbers[i]
+            for i in sorted(self._by_date[lo:hi])
+            if available[i]
+        ]
+
+    def remove(self, subset: Iterable[Summons]):
+        """Remove the summons of subset from the pool."""
+        for number in subset:
+            idx = self._index[id(number)]
+            if self._available[idx]:
+                self._available[idx] = 0
+                self._size -= 1
+
+
+def _candidate_count(target: Summons, numbers: list[Summons]) -> int:
+    """Count the numbers that are not larger than target."""
+    return len([i for i in numbers if i.amount <= target.amount])
+
+
+TARGET_ORDERS: dict[str, Callable[[Summons, list[Summons]], tuple]] = {
+    "date": lambda target, numbers: (target.date, target.amount),
+    "amount": lambda target, numbers: (target.amount, target.date),
+    "difficulty": lambda target, numbers: (
+        _candidate_count(target, numbers),
+        target.amount,
+    ),
+}
+
+
+def order_targets(
+    targets: list[Summons], numbers: list[Summons], order: str = "date"
+) -> list[int]:
+    """Return the indices of targets in processing order.
+
+    Parameters:
+        targets: The list of targets.
+        numbers: The candidate numbers of all targets.
+        order: One of TARGET_ORDERS. "date" and "amount" process the
+            earliest and the smallest targets first. "difficulty"
+            processes the targets with the fewest candidates first,
+            which shrinks the pool the fastest.
+    """
+    if order not in TARGET_ORDERS:
+        raise ValueError(f"Unknown target order: {order}")
+    key = TARGET_ORDERS[order]
+    return sorted(
+        range(len(targets)), key=lambda idx: key(targets[idx], numbers)
+    )
+
+
+def count_combinations(n: int, sizes: Iterable[int]) -> int:
+    """Count the combinations of n numbers of the given sizes."""
+    return sum(comb(n, r) for r in sizes)
 
 
 class AbstractExecutor(ABC):
@@ -47,6 +230,28 @@ class AbstractExecutor(ABC):
         """Initialize the status of the executor."""
         self._total_calculation = 0
         self._already_calculation = 0
+        self._pending_calculation = 0
+        # The units of work actually done, unlike the progress above,
+        # which may jump to the estimate of a finished target.
+        self.work = 0
+
+    def _advance(self, count: int, callback: Callable[[float], None]):
+        """Count finished work and report it once per PROGRESS_BATCH.
+
+        Reporting is kept out of the innermost loops, because the
+        callback usually has to check the time or talk to another
+        process.
+        """
+        self._pending_calculation += count
+        if self._pending_calculation >= PROGRESS_BATCH:
+            self._report(callback)
+
+    def _report(self, callback: Callable[[float], None]):
+        """Report the progress counted so far."""
+        self.work += self._pending_calculation
+        self._already_calculation += self._pending_calculation
+        self._pending_calculation = 0
+        callback(self._already_calculation / max(self._total_calculation, 1))
 
     @abstractmethod
     def calculate_all(
@@ -67,11 +272,126 @@ class AbstractExecutor(ABC):
         """
 
 
-class BruteForceExecutor(AbstractExecutor):
+class SequentialExecutor(AbstractExecutor):
     """
-    Executor that use brute-force to solve subset sum problem.
+    Executor that solves the targets one after another.
+
+    Subclasses only have to implement `_calculate`, which solves a
+    single target, and `_estimate`, which counts the work of a target
+    in the units passed to `_advance`. The progress jumps to the end of
+    a target's share once it is solved. The summons of every matched
+    target are removed from the candidates of the targets that follow.
+
+    With a CheckpointStore, the finished results and the frontier of
+    the current target are saved periodically. Subclasses keep the
+    frontier in `_frontier` and resume from `_resume`, which holds the
+    saved frontier when the current target was interrupted.
+
+    With a Budget, the search of a target that runs out of it is
+    abandoned, and the target is left unresolved with status
+    EXHAUSTED. Such targets are not saved to the checkpoint.
+
+    Only positive amounts are matched, as in every other executor:
+    summons of 0 or less are never candidates, and a target of 0 or
+    less is IMPOSSIBLE without any search.
     """
 
+    def __init__(
+        self,
+        order: str = "date",
+        window: Optional[DateWindow] = None,
+        checkpoint: Optional[CheckpointStore] = None,
+        budget: Optional[Budget] = None,
+    ):
+        """Initialize the executor.
+
+        Parameters:
+            order: The order in which targets are processed. See
+                order_targets.
+            window: If given, a target is only matched to the summons
+                dated within this window around its own date.
+            checkpoint: If given, the calculation is saved to it and
+                resumed from it.
+            budget: If given, the limits of the search of every
+                target.
+        """
+        super().__init__()
+        if order not in TARGET_ORDERS:
+            raise ValueError(f"Unknown target order: {order}")
+        self.order = order
+        self.window = window
+        self.checkpoint = checkpoint
+        self.budget = budget
+
+    def _init_status(self):
+        super()._init_status()
+        self._frontier = None
+        self._resume = None
+        self._state = None
+        # The time and the work when the current target was started.
+        self._spent = None
+
+    def _report(self, callback: Callable[[float], None]):
+        super()._report(callback)
+        if (
+            self._state is not None
+            and time.monotonic() - self._state["saved"]
+            >= self.checkpoint.interval
+        ):
+            self._save_checkpoint()
+        if self._spent is not None:
+            start_time, start_work = self._spent
+            reason = self.budget.exceeded(
+                time.monotonic() - start_time,
+                self._already_calculation - start_work,
+            )
+            if reason:
+                raise _BudgetExhausted(reason)
+
+    def _save_checkpoint(self):
+        """Save the finished results and the current frontier."""
+        self._state["saved"] = time.monotonic()
+        self.checkpoint.save(
+            self._state["key"],
+            {
+                "results": self._state["results"],
+                "current": self._state["current"],
+                "frontier": self._frontier,
+                "already": self._already_calculation,
+            },
+        )
+
+    def _load_checkpoint(
+        self, targets: list[Summons], numbers: list[Summons]
+    ) -> dict:
+        """Load the checkpoint of this calculation and start tracking.
+
+        Returns the saved state, which is empty if there is none.
+        """
+        key = ledger_key(
+            type(self).__name__, self.order, self.window, targets, numbers
+        )
+        saved = self.checkpoint.load(key) or {}
+        self._state = {
+            "key": key,
+            "results": dict(saved.get("results", {})),
+            "current": None,
+            "index": {id(n): i for i, n in enumerate(numbers)},
+            "saved": time.monotonic(),
+        }
+        return saved
+
+    def candidates(
+        self, target: Summons, pool: CandidatePool
+    ) -> list[Summons]:
+        """Return the numbers of pool that target may be matched to."""
+        if self.window is None:
+            numbers = list(pool)
+        else:
+            numbers = pool.between(*self.window.bounds(target.date))
+        return [i for i in numbers if i.amount > 0]
+
+    @abstractmethod
     def _calculate(
         self,
         target: Summons,
@@ -88,15 +408,10 @@ class BruteForceExecutor(AbstractExecutor):
                 progress of the calculation. Defaults to a no-op lambda
                 function.
         """
-        numbers = [i for i in numbers if i.amount <= target.amount]
-        for r in range(1, len(numbers)):
-            for combination in combinations(numbers, r):
-                total_amount = sum([i.amount for i in combination])
-                self._already_calculation += 1
-                callback(self._already_calculation / self._total_calculation)
-                if total_amount == target.amount:
-                    return Result(target, combination)
-        return Result(target, None)
+
+    @abstractmethod
+    def _estimate(self, target: Summons, numbers: list[Summons]) -> int:
+        """Estimate the amount of work to solve target."""
 
     def calculate_all(
         self,
@@ -105,24 +420,767 @@ class BruteForceExecutor(AbstractExecutor):
         callback: Callable[[float], None] = lambda x: None,
     ) -> list[Result]:
         self._init_status()
-        self._total_calculation = 2 ** len(numbers)
-        results = []
-        count = 0
-        _numbers = list(numbers)
+        pool = CandidatePool(numbers)
+        estimates = [
+            self._estimate(target, self.candidates(target, pool))
+            for target in targets
+        ]
+        self._total_calculation = max(sum(estimates), 1)
+        finished = 0
+        results = [None] * len(targets)
+        saved = {}
+        if self.checkpoint is not None:
+            saved = self._load_checkpoint(targets, numbers)
+            for idx, subset in saved.get("results", {}).items():
+                subset = subset and [numbers[i] for i in subset]
+                results[idx] = Result(targets[idx], subset)
+                if subset:
+                    pool.remove(subset)
+                finished += estimates[idx]
+            if saved:
+                _logger.info(
+                    f"Resumed {len(results) - results.count(None)} "
+                    "finished targets from checkpoint."
+                )
         overall_start_time = time.time()
-        for target in targets:
+        for idx in order_targets(targets, numbers, self.order):
+            if results[idx] is not None:
+                continue
+            target = targets[idx]
             start_time = time.time()
-            result = self._calculate(target, numbers, callback)
+            candidates = self.candidates(target, pool)
+            self._frontier = None
+            if saved.get("current") == idx:
+                self._resume = saved["frontier"]
+                self._already_calculation = saved["already"]
+            if self._state is not None:
+                self._state["current"] = idx
+            if self.budget is not None:
+                self._spent = (time.monotonic(), self._already_calculation)
+            try:
+                if target.amount <= 0:
+                    result = Result(target, None)
+                else:
+                    result = self._calculate(target, candidates, callback)
+            except _BudgetExhausted as e:
+                _logger.warning(f"Target: {target.amount}, {e}.")
+                result = Result(target, None, Status.EXHAUSTED, str(e))
+            self._spent = None
+            self._resume = None
             end_time = time.time()
             _logger.info(
-                f"Target: {target.amount}, "
+                f"Target: {target.amount}, candidates: {len(candidates)}, "
                 f"elapsed time: {end_time - start_time:.3f} seconds."
             )
-            results.append(result)
+            results[idx] = result
             if result.subset:
-                for i in result.subset:
-                    _numbers.remove(i)
-            count = count + 1
+                pool.remove(result.subset)
+            if self._state is not None:
+                if result.status is not Status.EXHAUSTED:
+                    index = self._state["index"]
+                    self._state["results"][idx] = result.subset and [
+                        index[id(i)] for i in result.subset
+                    ]
+                self._state["current"] = None
+                self._frontier = None
+            finished += estimates[idx]
+            self.work += self._pending_calculation
+            self._already_calculation = finished
+            self._pending_calculation = 0
+            self._report(callback)
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+            self._state = None
+        elapsed_time = time.time() - overall_start_time
+        _logger.info(f"Total elapsed time: {elapsed_time:.3f} seconds.")
+        return results
+
+
+class BruteForceExecutor(SequentialExecutor):
+    """
+    Executor that use brute-force to solve subset sum problem.
+    """
+
+    def _calculate(
+        self,
+        target: Summons,
+        numbers: list[Summons],
+        callback: Callable[[float], None] = lambda x: None,
+    ) -> Result:
+        ledger = CompactLedger(i for i in numbers if i.amount <= target.amount)
+        first, skip = self._resume or (1, 0)
+        return self.search(
+            target, ledger, range(first, len(ledger) + 1), callback, skip=skip
+        )
+
+    def _estimate(self, target: Summons, numbers: list[Summons]) -> int:
+        n = _candidate_count(target, numbers)
+        return count_combinations(n, range(1, n + 1))
+
+    def search(
+        self,
+        target: Summons,
+        numbers: CompactLedger | list[Summons],
+        sizes: Iterable[int],
+        callback: Callable[[float], None] = lambda x: None,
+        should_stop: Callable[[], bool] = lambda: False,
+        skip: int = 0,
+    ) -> Result:
+        """Search the combinations of the given sizes only.
+
+        This makes it possible to split the search of one target
+        across several workers.
+
+        Parameters:
+            target: The target that we want to solve.
+            numbers: The numbers whose combinations are searched. A
+                list is turned into a CompactLedger first.
+            sizes: The sizes of the combinations to search.
+            callback: A callback function that is called with the
+                progress of the calculation.
+            should_stop: A function that is polled every
+                PROGRESS_BATCH combinations. The search gives up and
+                returns no subset once it returns True.
+            skip: The number of combinations of the first size that
+                were searched before, as saved in the frontier.
+        """
+        ledger = numbers
+        if not isinstance(ledger, CompactLedger):
+            ledger = CompactLedger(numbers)
+        amounts = ledger.amounts
+        goal = target.amount
+        for r in sizes:
+            count = 0
+            done, skip = skip, 0
+            # The combinations of amounts are summed, and the matching
+            # combination of indices is only used for a hit.
+            pairs = zip(
+                combinations(amounts, r), combinations(range(len(ledger)), r)
+            )
+            for combination, chosen in islice(pairs, done, None):
+                count += 1
+                if sum(combination) == goal:
+                    self._advance(count, callback)
+                    return Result(target, ledger.materialize(chosen))
+                if count == PROGRESS_BATCH:
+                    done += count
+                    self._frontier = (r, done)
+                    self._advance(count, callback)
+                    count = 0
+                    if should_stop():
+                        return Result(target, None)
+            # Report at the end of every size as well.
+            self._pending_calculation += count
+            self._report(callback)
+        return Result(target, None)
+
+
+class DynamicProgrammingExecutor(SequentialExecutor):
+    """
+    Executor that use dynamic programming to solve subset sum problem.
+
+    The amounts of summons are integers, so the sums that can be
+    reached are tracked in a table indexed by value. Each reachable
+    sum keeps a back-pointer to the summons that first reached it,
+    which makes the runtime O(n * target) instead of O(2 ** n).
+    """
+
+    def _estimate(self, target: Summons, numbers: list[Summons]) -> int:
+        # Every candidate updates the cells of the table below it.
+        return sum(
+            target.amount - i.amount + 1
+            for i in numbers
+            if 0 < i.amount <= target.amount
+        )
+
+    def _calculate(
+        self,
+        target: Summons,
+        numbers: list[Summons],
+        callback: Callable[[float], None] = lambda x: None,
+    ) -> Result:
+        ledger = CompactLedger(
+            i for i in numbers if 0 < i.amount <= target.amount
+        )
+        if target.amount <= 0:
+            return Result(target, None)
+        amounts = ledger.amounts
+        # parents[s] is the index of the summons that first reached the
+        # sum s, or -1 if s is not reachable yet. The empty subset
+        # reaches 0, which is marked with the len(amounts) sentinel.
+        parents = [-1] * (target.amount + 1)
+        parents[0] = len(amounts)
+        for idx, amount in enumerate(amounts):
+            # Walk downwards so that every summons is used at most once.
+            for s in range(target.amount, amount - 1, -1):
+                if parents[s] == -1 and parents[s - amount] != -1:
+                    parents[s] = idx
+            self._advance(target.amount - amount + 1, callback)
+            if parents[target.amount] != -1:
+                break
+        if parents[target.amount] == -1:
+            return Result(target, None)
+        subset = []
+        remain = target.amount
+        while remain:
+            subset.append(parents[remain])
+            remain -= amounts[parents[remain]]
+        return Result(target, ledger.materialize(subset))
+
+
+class MeetInTheMiddleExecutor(SequentialExecutor):
+    """
+    Executor that use meet-in-the-middle to solve subset sum problem.
+
+    The numbers are split into two halves. The subset sums of each
+    half are enumerated, and the sorted sums of one half are searched
+    for the complement of every sum of the other half. It costs about
+    2 ** (n / 2) * n instead of 2 ** n and, unlike
+    DynamicProgrammingExecutor, does not depend on the target amount.
+    """
+
+    def _estimate(self, target: Summons, numbers: list[Summons]) -> int:
+        n = _candidate_count(target, numbers)
+        # Both halves are enumerated and the left half is joined.
+        return 2 * 2 ** (n // 2) + 2 ** (n - n // 2)
+
+    def _subset_sums(
+        self,
+        amounts: Iterable[int],
+        callback: Callable[[float], None],
+    ) -> list[tuple[int, int]]:
+        """Enumerate the subset sums of amounts.
+
+        Returns a list of (sum, mask) pairs where bit i of mask is set
+        if amounts[i] is part of the subset.
+        """
+        sums = [(0, 0)]
+        for idx, amount in enumerate(amounts):
+            bit = 1 << idx
+            sums += [(s + amount, mask | bit) for s, mask in sums]
+            self._advance(len(sums) // 2, callback)
+        return sums
+
+    def _calculate(
+        self,
+        target: Summons,
+        numbers: list[Summons],
+        callback: Callable[[float], None] = lambda x: None,
+    ) -> Result:
+        ledger = CompactLedger(i for i in numbers if i.amount <= target.amount)
+        half = len(ledger) // 2
+        left_sums = self._subset_sums(ledger.amounts[:half], callback)
+        right_sums = self._subset_sums(ledger.amounts[half:], callback)
+        right_sums.sort()
+        right_keys = [s for s, _ in right_sums]
+        for left_sum, left_mask in left_sums:
+            self._advance(1, callback)
+            need = target.amount - left_sum
+            idx = bisect_left(right_keys, need)
+            while idx < len(right_keys) and right_keys[idx] == need:
+                right_mask = right_sums[idx][1]
+                if left_mask or right_mask:
+                    mask = left_mask | right_mask << half
+                    subset = [i for i in range(len(ledger)) if mask >> i & 1]
+                    return Result(target, ledger.materialize(subset))
+                idx += 1
+        return Result(target, None)
+
+
+class BranchAndBoundExecutor(SequentialExecutor):
+    """
+    Executor that use depth-first branch and bound to solve subset sum
+    problem.
+
+    The amounts are sorted in descending order and their suffix sums
+    are precomputed. A branch is pruned when the amount overshoots the
+    remaining target or when all remaining amounts cannot reach it. An
+    amount equal to the one tried before at the same depth is skipped,
+    because it leads to the same sums.
+    """
+
+    def _estimate(self, target: Summons, numbers: list[Summons]) -> int:
+        # Every non-empty subset is a node of the search tree at most.
+        return 2 ** _candidate_count(target, numbers) - 1
+
+    def _calculate(
+        self,
+        target: Summons,
+        numbers: list[Summons],
+        callback: Callable[[float], None] = lambda x: None,
+    ) -> Result:
+        subset = next(self._branches(target, numbers, callback), None)
+        return Result(target, subset)
+
+    def _branches(
+        self,
+        target: Summons,
+        numbers: list[Summons],
+        callback: Callable[[float], None] = lambda x: None,
+    ) -> Iterator[list[Summons]]:
+        """Yield every distinct subset of numbers that sums to target.
+
+        Subsets that only differ by summons of equal amounts are yielded
+        once, because equal amounts are skipped at the same depth.
+        """
+        if target.amount <= 0:
+            return
+        ledger = CompactLedger(
+            i for i in numbers if 0 < i.amount <= target.amount
+        )
+        # The indices of ledger by descending amount.
+        order = sorted(
+            range(len(ledger)), key=ledger.amounts.__getitem__, reverse=True
+        )
+        amounts = [ledger.amounts[i] for i in order]
+        n = len(amounts)
+        suffix = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            suffix[i] = suffix[i + 1] + amounts[i]
+        chosen = []  # The indices of the current branch.
+        remain = target.amount
+        j = 0  # The next index to try at the current depth.
+        if self._resume:
+            chosen, j, remain = list(self._resume[0]), *self._resume[1:]
+        count = 0
+        while True:
+            if remain == 0:
+                self._advance(count, callback)
+                count = 0
+                yield ledger.materialize(order[i] for i in chosen)
+                # Backtrack to look for the next subset.
+                j = chosen.pop()
+                remain += amounts[j]
+                j += 1
+                continue
+            count += 1
+            if count == PROGRESS_BATCH:
+                self._frontier = (tuple(chosen), j, remain)
+                self._advance(count, callback)
+                count = 0
+            start = chosen[-1] + 1 if chosen else 0
+            while j < n and suffix[j] >= remain:
+                if amounts[j] <= remain and (
+                    j == start or amounts[j] != amounts[j - 1]
+                ):
+                    break
+                j += 1
+            if j < n and suffix[j] >= remain:
+                chosen.append(j)
+                remain -= amounts[j]
+                j += 1
+            elif chosen:
+                # Backtrack and try the next index at the upper depth.
+                j = chosen.pop()
+                remain += amounts[j]
+                j += 1
+            else:
+                self._advance(count, callback)
+                return
+
+    def iter_matches(
+        self,
+        targets: list[Summons],
+        numbers: list[Summons],
+        limit: Optional[int] = None,
+        callback: Callable[[float], None] = lambda x: None,
+    ) -> Iterator[Result]:
+        """Lazily yield the distinct subsets of every target.
+
+        Unlike calculate_all, the targets do not take summons from each
+        other, so that a summons that could match several targets shows
+        up in all of them. Every subset is a Result of its own, and the
+        Results of a target follow each other. A target without subset
+        is a single Result without subset, and a target whose budget
+        runs out ends with an EXHAUSTED Result.
+
+        Parameters:
+            targets: The list of targets.
+            numbers: The subset that we search for the sum
+                of its subset is equal to target.
+            limit: The maximum number of subsets of a target, or None
+                for all of them.
+            callback: A callback function that is called with the
+                share of finished targets, including the estimated
+                share of the current one, once per PROGRESS_BATCH.
+        """
+        self._init_status()
+        pool = CandidatePool(numbers)
+        for idx, target in enumerate(targets):
+            found = 0
+            if self.budget is not None:
+                self._spent = (time.monotonic(), self._already_calculation)
+            candidates = self.candidates(target, pool)
+            estimate = max(self._estimate(target, candidates), 1)
+            start = self._already_calculation
+
+            def report(_, idx=idx, estimate=estimate, start=start):
+                share = (self._already_calculation - start) / estimate
+                callback((idx + min(share, 1)) / len(targets))
+
+            branches = self._branches(target, candidates, report)
+            try:
+                for subset in islice(branches, limit):
+                    found += 1
+                    yield Result(target, subset)
+            except _BudgetExhausted as e:
+                _logger.warning(f"Target: {target.amount}, {e}.")
+                yield Result(target, None, Status.EXHAUSTED, str(e))
+            else:
+                if not found:
+                    yield Result(target, None)
+            finally:
+                self._spent = None
+            _logger.info(f"Target: {target.amount}, subsets: {found}.")
+            callback((idx + 1) / len(targets))
+
+
+class PlannedExecutor(SequentialExecutor):
+    """
+    Executor that solves every target with the cheapest strategy.
+
+    The cost of every strategy is estimated from the candidates of the
+    target, in rough microseconds of pure Python:
+
+    - BruteForceExecutor: every combination, cheap for tiny n.
+    - DynamicProgrammingExecutor: a cell per candidate and value up to
+      the target amount, cheap for small amounts.
+    - MeetInTheMiddleExecutor: every subset of both halves, for mid
+      sized n with large amounts.
+    - BranchAndBoundExecutor: every distinct multiset of the amounts,
+      which collapses when amounts are duplicated.
+
+    The strategies whose tables hold more than `max_cells` divided by
+    `cores` entries are left out, because that many targets may be
+    solved at the same time.
+
+    Attributes:
+        cores: The number of targets solved at the same time.
+        max_cells: The number of table entries all of them may hold.
+        strategies: The executors to choose from, by class.
+    """
+
+    # The cost of a unit of work of every strategy.
+    WEIGHTS = {
+        BruteForceExecutor: 1.0,
+        DynamicProgrammingExecutor: 0.1,
+        MeetInTheMiddleExecutor: 1.5,
+        BranchAndBoundExecutor: 1.0,
+    }
+
+    def __init__(
+        self,
+        order: str = "date",
+        window: Optional[DateWindow] = None,
+        checkpoint: Optional[CheckpointStore] = None,
+        budget: Optional[Budget] = None,
+        cores: Optional[int] = None,
+        max_cells: int = 1 << 26,
+    ):
+        """Initialize the executor.
+
+        Parameters:
+            order: See SequentialExecutor.
+            window: See SequentialExecutor.
+            checkpoint: See SequentialExecutor.
+            budget: See SequentialExecutor.
+            cores: The number of targets solved at the same time.
+                Defaults to the number of cores.
+            max_cells: The number of table entries that the tables of
+                all targets solved at the same time may hold.
+        """
+        super().__init__(order, window, checkpoint, budget)
+        self.cores = cores or os.cpu_count() or 1
+        self.max_cells = max_cells
+        self.strategies = {cls: cls() for cls in self.WEIGHTS}
+
+    def costs(
+        self, target: Summons, numbers: list[Summons]
+    ) -> dict[type[SequentialExecutor], float]:
+        """Estimate the cost of every suitable strategy for target."""
+        amounts = [i.amount for i in numbers if 0 < i.amount <= target.amount]
+        n = len(amounts)
+        limit = self.max_cells // self.cores
+        work = {
+            BruteForceExecutor: count_combinations(n, range(1, n + 1)),
+            BranchAndBoundExecutor: prod(
+                count + 1 for count in Counter(amounts).values()
+            )
+            - 1,
+        }
+        if target.amount + 1 <= limit:
+            work[DynamicProgrammingExecutor] = self.strategies[
+                DynamicProgrammingExecutor
+            ]._estimate(target, numbers)
+        if 2 ** (n - n // 2) <= limit:
+            work[MeetInTheMiddleExecutor] = self.strategies[
+                MeetInTheMiddleExecutor
+            ]._estimate(target, numbers)
+        return {cls: self.WEIGHTS[cls] * units for cls, units in work.items()}
+
+    def plan(
+        self, target: Summons, numbers: list[Summons]
+    ) -> tuple[SequentialExecutor, float]:
+        """Return the cheapest strategy for target and its cost."""
+        costs = self.costs(target, numbers)
+        cls = min(costs, key=costs.get)
+        return self.strategies[cls], costs[cls]
+
+    def _estimate(self, target: Summons, numbers: list[Summons]) -> int:
+        strategy, _ = self.plan(target, numbers)
+        return strategy._estimate(target, numbers)
+
+    def _calculate(
+        self,
+        target: Summons,
+        numbers: list[Summons],
+        callback: Callable[[float], None] = lambda x: None,
+    ) -> Result:
+        strategy, cost = self.plan(target, numbers)
+        _logger.info(
+            f"Target: {target.amount}, candidates: {len(numbers)}, "
+            f"planned {type(strategy).__name__} at cost {cost:.0f}."
+        )
+        strategy._init_status()
+        # The plan of a target is the same after a resume.
+        strategy._resume = self._resume
+        forwarded = 0
+
+        def forward(progress: float):
+            # Count the work of the strategy as the work of this
+            # executor, which tracks the progress, budget and
+            # checkpoint.
+            nonlocal forwarded
+            self._frontier = strategy._frontier
+            self._pending_calculation += strategy.work - forwarded
+            forwarded = strategy.work
+            self._report(callback)
+
+        result = strategy._calculate(target, numbers, forward)
+        self._pending_calculation += (
+            strategy.work + strategy._pending_calculation - forwarded
+        )
+        return result
+
+
+class VectorizedExecutor(AbstractExecutor):
+    """
+    Executor that use NumPy to solve all targets with one enumeration.
+
+    The amounts are kept in an int64 array. The sums of the lowest
+    `low_bits` numbers are precomputed in a table indexed by bitmask,
+    and every block of the remaining bitmasks is added to that table
+    at once. Each block is checked against the amounts of all
+    unsolved targets, so the subsets are enumerated only once no
+    matter how many targets there are. A subset is only accepted if
+    none of its summons is matched to another target yet.
+    """
+
+    def __init__(self, low_bits: int = 16, block_size: int = 1 << 20):
+        """Initialize the executor.
+
+        Parameters:
+            low_bits: The number of numbers in the partial-sum table.
+            block_size: The number of subset sums checked at once.
+        """
+        if np is None:
+            raise ImportError("VectorizedExecutor requires numpy.")
+        super().__init__()
+        self.low_bits = low_bits
+        self.block_size = block_size
+
+    @staticmethod
+    def _partial_sums(amounts: "np.ndarray") -> "np.ndarray":
+        """Return the sums of all subsets of amounts indexed by mask."""
+        table = np.zeros(1, dtype=np.int64)
+        for amount in amounts:
+            table = np.concatenate((table, table + amount))
+        return table
+
+    def calculate_all(
+        self,
+        targets: list[Summons],
+        numbers: list[Summons],
+        callback: Callable[[float], None] = lambda x: None,
+    ) -> list[Result]:
+        self._init_status()
+        overall_start_time = time.time()
+        subsets: dict[int, list[Summons]] = {}
+        pending: dict[int, list[int]] = {}
+        used = 0  # The mask of the numbers that are already matched.
+        for idx, target in enumerate(targets):
+            if target.amount > 0:
+                pending.setdefault(target.amount, []).append(idx)
+        limit = max(pending, default=0)
+        ledger = CompactLedger(i for i in numbers if 0 < i.amount <= limit)
+        # The array of ledger is viewed without copying.
+        amounts = np.frombuffer(ledger.amounts, dtype=np.int64)
+        low_bits = min(self.low_bits, len(ledger))
+        high_amounts = amounts[low_bits:]
+        low_table = self._partial_sums(amounts[:low_bits])
+        high_shifts = np.arange(len(high_amounts), dtype=np.int64)
+        rows = max(self.block_size // len(low_table), 1)
+        total_rows = 1 << len(high_amounts)
+        self._total_calculation = total_rows * len(low_table)
+        for start in range(0, total_rows, rows):
+            if not pending:
+                break
+            high_masks = np.arange(
+                start, min(start + rows, total_rows), dtype=np.int64
+            )
+            high_sums = ((high_masks[:, None] >> high_shifts) & 1) @ (
+                high_amounts
+            )
+            sums = (high_sums[:, None] + low_table[None, :]).ravel()
+            if start == 0:
+                sums[0] = -1  # Skip the empty subset.
+            wanted = np.fromiter(pending, dtype=np.int64, count=len(pending))
+            hits = np.flatnonzero(np.isin(sums, wanted))
+            for value, pos in zip(sums[hits].tolist(), hits.tolist()):
+                if value not in pending:
+                    continue
+                mask = (start + pos // len(low_table)) << low_bits
+                mask |= pos % len(low_table)
+                if mask & used:
+                    continue  # A summons is already matched.
+                used |= mask
+                subsets[pending[value].pop(0)] = ledger.materialize(
+                    i for i in range(len(ledger)) if mask >> i & 1
+                )
+                if not pending[value]:
+                    del pending[value]
+            self._advance(len(sums), callback)
+        self._report(callback)
+        results = [
+            Result(target, subsets.get(idx))
+            for idx, target in enumerate(targets)
+        ]
+        elapsed_time = time.time() - overall_start_time
+        _logger.info(f"Total elapsed time: {elapsed_time:.3f} seconds.")
+        return results
+
+
+class BitsetExecutor(AbstractExecutor):
+    """
+    Executor that tracks reachable sums in a Python integer bitset.
+
+    Bit s of the bitset is set if some subset of numbers sums up to s,
+    and adding a summons is a single shift and or. Targets whose bit
+    is not set are unreachable and are answered without any search.
+    The subsets of the reachable targets are rebuilt by walking the
+    numbers backwards, replaying the bitsets from checkpoints that are
+    stored every `checkpoint_interval` numbers. After a target is
+    matched, the bitsets are computed again without its summons.
+    """
+
+    def __init__(self, checkpoint_interval: int = 64):
+        """Initialize the executor.
+
+        Parameters:
+            checkpoint_interval: The number of numbers between two
+                stored bitsets.
+        """
+        super().__init__()
+        self.checkpoint_interval = checkpoint_interval
+
+    def _screen(
+        self,
+        amounts: Iterable[int],
+        mask: int,
+        callback: Callable[[float], None],
+    ) -> tuple[int, list[int]]:
+        """Compute the sums reachable by amounts.
+
+        Returns the bitset of reachable sums and the bitsets stored
+        every checkpoint_interval amounts.
+        """
+        checkpoints = []
+        reach = 1
+        for idx, amount in enumerate(amounts):
+            if idx % self.checkpoint_interval == 0:
+                checkpoints.append(reach)
+            reach = (reach | reach << amount) & mask
+            self._advance(1, callback)
+        return reach, checkpoints
+
+    def _rebuild(
+        self,
+        target: Summons,
+        amounts: list[int],
+        checkpoints: list[int],
+        mask: int,
+    ) -> list[int]:
+        """Rebuild a subset of amounts that sums up to target.
+
+        The target must be reachable by amounts. Returns the indices of
+        the subset.
+        """
+        subset = []
+        remain = target.amount
+        interval = self.checkpoint_interval
+        for block in range(len(checkpoints) - 1, -1, -1):
+            if not remain:
+                break
+            start = block * interval
+            block_amounts = amounts[start : start + interval]
+            # reaches[j] is the bitset before block_amounts[j] is added.
+            reaches = [checkpoints[block]]
+            for amount in block_amounts[:-1]:
+                reach = reaches[-1]
+                reaches.append((reach | reach << amount) & mask)
+            for j in range(len(block_amounts) - 1, -1, -1):
+                if not remain:
+                    break
+                if not reaches[j] >> remain & 1:
+                    subset.append(start + j)
+                    remain -= block_amounts[j]
+        return subset
+
+    def calculate_all(
+        self,
+        targets: list[Summons],
+        numbers: list[Summons],
+        callback: Callable[[float], None] = lambda x: None,
+    ) -> list[Result]:
+        self._init_status()
+        overall_start_time = time.time()
+        limit = max([i.amount for i in targets], default=0)
+        mask = (1 << limit + 1) - 1
+        numbers = [i for i in numbers if 0 < i.amount <= limit]
+        # Every matched target screens the remaining numbers again.
+        self._total_calculation = max(len(numbers) * (2 * len(targets) + 1), 1)
+        ledger = CompactLedger(numbers)
+        reach, checkpoints = self._screen(ledger.amounts, mask, callback)
+        _logger.info(
+            f"Reachable sums screened in "
+            f"{time.time() - overall_start_time:.3f} seconds."
+        )
+        results = []
+        pool = CandidatePool(numbers)
+        for target in targets:
+            # Targets unreachable by all numbers stay unreachable.
+            if target.amount <= 0 or not reach >> target.amount & 1:
+                results.append(Result(target, None))
+                continue
+            start_time = time.time()
+            if len(pool) != len(ledger):
+                ledger = CompactLedger(pool)
+                reach, checkpoints = self._screen(
+                    ledger.amounts, mask, callback
+                )
+            subset = None
+            if reach >> target.amount & 1:
+                subset = ledger.materialize(
+                    self._rebuild(target, ledger.amounts, checkpoints, mask)
+                )
+                pool.remove(subset)
+            self._advance(len(ledger), callback)
+            _logger.info(
+                f"Target: {target.amount}, "
+                f"elapsed time: {time.time() - start_time:.3f} seconds."
+            )
+            results.append(Result(target, subset))
+        self._report(callback)
         elapsed_time = time.time() - overall_start_time
         _logger.info(f"Total elapsed time: {elapsed_time:.3f} seconds.")
         return results
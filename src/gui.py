@@ -1,29 +1,59 @@
 """This module is used to create GUI and use it."""
 
+import argparse
 import multiprocessing
 import multiprocessing.pool
 import tkinter as tk
 from contextlib import suppress
+from functools import partial
 from pathlib import Path
 from tkinter import filedialog, messagebox, ttk
+from typing import Optional
 
+from src.cache import CachedSubprocessManager, ResultCache
+from src.checkpoint import CheckpointStore
 from src.data_loader import AbstractDataLoader, ExcelDataLoader
-from src.executor import BruteForceExecutor, Result
-from src.output import output_excel
-from src.subprocess import AbstractSubprocessManager, SubprocessManager
+from src.executor import (
+    AbstractExecutor,
+    BranchAndBoundExecutor,
+    BruteForceExecutor,
+    DateWindow,
+    PlannedExecutor,
+    Result,
+)
+from src.incremental import IncrementalSubprocessManager, SnapshotStore
+from src.output import count_statuses, output_excel, stream_output_excel
+from src.subprocess import (
+    AbstractSubprocessManager,
+    ParallelSubprocessManager,
+    ScheduledSubprocessManager,
+    SubprocessManager,
+)
+
+# The managers that run_gui can calculate with. "parallel" splits the
+# search of every target over all cores, but only with brute force, and
+# "scheduled" solves the targets on all cores at once.
+MANAGERS: dict[str, type[AbstractSubprocessManager]] = {
+    "parallel": ParallelSubprocessManager,
+    "scheduled": ScheduledSubprocessManager,
+    "single": SubprocessManager,
+}
 
 
 class GUI:
     def __init__(
         self,
         data_loader: AbstractDataLoader,
-        executor: BruteForceExecutor,
+        executor: AbstractExecutor,
         manager: AbstractSubprocessManager,
         interval: float = 0.0,
     ):
         self.root = None
         self.data_loader = data_loader
         self.executor = executor
+        self.enumerator = BranchAndBoundExecutor(
+            window=getattr(executor, "window", None)
+        )
         self.interval = interval
         try:
             self._init_tk()
@@ -50,9 +80,47 @@ class GUI:
             self.root,
             style="Custom.TButton",
         )
+        self.enumerate_var = tk.BooleanVar(value=False)
+        self.enumerate_check = ttk.Checkbutton(
+            self.root, text="列出所有配對", variable=self.enumerate_var
+        )
+        self.rows_var = tk.BooleanVar(value=False)
+        self.rows_check = ttk.Checkbutton(
+            self.root, text="逐列輸出結果", variable=self.rows_var
+        )
+        # The date window is empty for no window, and starts from the
+        # window of the executor.
+        window = getattr(self.executor, "window", None)
+        self.before_var = tk.StringVar(
+            value=str(window.before) if window else ""
+        )
+        self.after_var = tk.StringVar(
+            value=str(window.after) if window else ""
+        )
+        window_frame = ttk.Frame(self.root)
+        ttk.Label(window_frame, text="日期範圍：前").pack(side=tk.LEFT)
+        ttk.Spinbox(
+            window_frame,
+            from_=0,
+            to=3650,
+            width=5,
+            textvariable=self.before_var,
+        ).pack(side=tk.LEFT)
+        ttk.Label(window_frame, text="天至後").pack(side=tk.LEFT)
+        ttk.Spinbox(
+            window_frame,
+            from_=0,
+            to=3650,
+            width=5,
+            textvariable=self.after_var,
+        ).pack(side=tk.LEFT)
+        ttk.Label(window_frame, text="天（空白為不限）").pack(side=tk.LEFT)
         self.set_initial_state()
         self.status_label.pack(pady=20)
         self.button.pack(pady=20)
+        self.enumerate_check.pack(pady=(0, 10))
+        self.rows_check.pack(pady=(0, 10))
+        window_frame.pack(pady=(0, 20))
 
     def cleanup(self):
         """Cleanup resources.
@@ -83,17 +151,25 @@ class GUI:
         """Save the results."""
         self.save_file(results)
 
+    def enumeration_done(self, filename: str, count: int):
+        """Show where the matches are written."""
+        self.label_var.set(f"已將 {count} 組配對寫入 {filename}\n請選擇新檔案")
+        self.button.configure(text="選擇檔案", command=self.run_action)
+
     def subprocess_error(self, e: BaseException):
         """Handle error from subprocess."""
         self.handle_error(f"計算時發生錯誤：{str(e)}")
 
     def update_status(self):
         """Update the status of the calculation."""
+        if not self.manager.is_running():
+            # A calculation that is already done has written its own
+            # label, which the last progress must not overwrite.
+            return
         if progress := self.manager.update_status():
             print(f"進度: {progress*100:.2%}")
             self.label_var.set(f"進度: {progress*100:.2%}")
-        if self.manager.is_running():
-            self.root.after(3000, self.update_status)
+        self.root.after(3000, self.update_status)
 
     def open_file(self):
         """Load data from file."""
@@ -103,25 +179,52 @@ class GUI:
         if not file_path:
             return
         self.data_loader.load(file_path, reload=True)
+        self.manager.open_workbook(file_path)
         filename = Path(file_path).name
         self.label_var.set(f"讀取檔案：{filename}")
         return file_path
 
+    def ask_save_filename(self):
+        """Ask for the output file, or return the default one."""
+        filename = filedialog.asksaveasfilename(
+            title="儲存檔案",
+            defaultextension=".xlsx",
+            filetypes=[("*.xlsx", ".xlsx")],
+        )
+        if not filename:
+            filename = Path("export.xlsx").absolute()  # Default path
+        return filename
+
     def save_file(self, results: list[Result]):
         try:
-            filename = filedialog.asksaveasfilename(
-                title="儲存檔案",
-                defaultextension=".xlsx",
-                filetypes=[("*.xlsx", ".xlsx")],
+            filename = self.ask_save_filename()
+            # The row layout is written in write-only mode, which keeps
+            # large results fast.
+            if self.rows_var.get():
+                stream_output_excel(results, self.data_loader, filename)
+            else:
+                output_excel(results, self.data_loader, filename)
+            self.label_var.set(
+                f"結果已經寫入 {filename}\n"
+                f"{count_statuses(results)}\n請選擇新檔案"
             )
-            if not filename:
-                filename = Path("export.xlsx").absolute()  # Default path
-            output_excel(results, self.data_loader, filename)
-            self.label_var.set(f"結果已經寫入 {filename}\n請選擇新檔案")
             self.button.configure(text="選擇檔案", command=self.run_action)
         except Exception as e:
             self.handle_error(f"檔案寫入時發生錯誤：{str(e)}")
 
+    def apply_window(self):
+        """Set the date window of the input to the executors."""
+        before = self.before_var.get().strip()
+        after = self.after_var.get().strip()
+        window = None
+        if before or after:
+            window = DateWindow(int(before or 0), int(after or 0))
+            if window.before < 0 or window.after < 0:
+                raise ValueError("日期範圍不可為負數")
+        for executor in (self.executor, self.enumerator):
+            if hasattr(executor, "window"):
+                executor.window = window
+
     def run_action(self):
         """Load data and start calculation."""
         try:
@@ -133,15 +236,36 @@ class GUI:
         targets = self.data_loader.targets
         numbers = self.data_loader.numbers
         try:
-            self.manager.start_calculation(
-                self.executor,
-                targets,
-                numbers,
-                self.subprocess_done,
-                self.subprocess_error,
-                self.interval,
-            )
+            self.apply_window()
+            filename = None
+            if self.enumerate_var.get():
+                # The matches are written while they are searched, so
+                # the file is chosen first.
+                filename = self.ask_save_filename()
+            # The running state is set first, so that a callback that
+            # runs before start returns has the last word.
             self.set_running_state()
+            if filename:
+                self.manager.start_enumeration(
+                    self.enumerator,
+                    targets,
+                    numbers,
+                    self.data_loader,
+                    filename,
+                    None,
+                    partial(self.enumeration_done, filename),
+                    self.subprocess_error,
+                    self.interval,
+                )
+            else:
+                self.manager.start_calculation(
+                    self.executor,
+                    targets,
+                    numbers,
+                    self.subprocess_done,
+                    self.subprocess_error,
+                    self.interval,
+                )
             self.update_status()
         except Exception as e:
             self.handle_error(f"啟動計算時發生錯誤：{str(e)}")
@@ -163,12 +287,33 @@ class GUI:
         self.root.mainloop()
 
 
-def run_gui():
+def run_gui(argv: Optional[list[str]] = None):
     """Run the GUI.
 
     NOTE: This function must run straight after the
     if __name__ == '__main__' line of the main module.
+
+    Parameters:
+        argv: The command line arguments, or sys.argv if None. They
+            are parsed after freeze_support, which handles the
+            arguments of the child processes of frozen programs.
     """
     multiprocessing.freeze_support()
-    app = GUI(ExcelDataLoader(), BruteForceExecutor(), SubprocessManager())
+    parser = argparse.ArgumentParser(description="Match the targets.")
+    parser.add_argument(
+        "--manager",
+        choices=sorted(MANAGERS),
+        default="single",
+        help="how the calculation is spread over the cores",
+    )
+    args = parser.parse_args(argv)
+    manager = IncrementalSubprocessManager(
+        CachedSubprocessManager(MANAGERS[args.manager](), ResultCache()),
+        SnapshotStore(),
+    )
+    if args.manager == "parallel":
+        executor = BruteForceExecutor()
+    else:
+        executor = PlannedExecutor(checkpoint=CheckpointStore())
+    app = GUI(ExcelDataLoader(), executor, manager)
     app.mainloop()
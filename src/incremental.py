@@ -0,0 +1,203 @@
+"""This module solves again only the targets a ledger change affects."""
+
+import logging
+import pickle
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.checkpoint import save_atomically
+from src.data_loader import Summons
+from src.executor import AbstractExecutor, Result
+from src.subprocess import AbstractSubprocessManager
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = Path.home() / ".sum" / "snapshot.pickle"
+
+
+def _key(summons: Summons) -> tuple:
+    """Identify a summons across two loads of a ledger."""
+    return summons.account, summons.date, summons.amount
+
+
+class SnapshotStore:
+    """
+    A local file that holds the last run of every workbook.
+
+    A snapshot is the keys of the numbers and the results of a run, so
+    the next run of the workbook can be diffed against it after the
+    program is restarted. The snapshots are keyed by the resolved path
+    of their workbook.
+
+    Attributes:
+        path: The path of the snapshot file.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_SNAPSHOT_PATH):
+        self.path = Path(path)
+
+    def _load_all(self) -> dict:
+        """Return the snapshots of all workbooks."""
+        try:
+            with open(self.path, "rb") as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return {}
+
+    def load(self, workbook: str) -> Optional[tuple[set, dict]]:
+        """Return the numbers and results of the last run, if any."""
+        return self._load_all().get(str(Path(workbook).resolve()))
+
+    def save(self, workbook: str, numbers: set, results: dict):
+        """Replace the snapshot of the workbook.
+
+        See save_atomically.
+        """
+        snapshots = self._load_all()
+        snapshots[str(Path(workbook).resolve())] = (numbers, results)
+        save_atomically(self.path, snapshots)
+
+
+class IncrementalSubprocessManager(AbstractSubprocessManager):
+    """
+    Subprocess manager that reuses the results of the previous run.
+
+    The targets and numbers of every calculation are diffed against the
+    previous one. A result is kept if its target and all of its summons
+    are still in the ledger. Only the other targets, which are new,
+    were not matched, or lost a summons, are sent to the wrapped
+    manager. The summons that were not in the previous ledger are
+    offered to them first.
+
+    With a SnapshotStore, the previous run of a workbook is loaded when
+    the workbook is opened and saved after every run, so a rerun after
+    a restart is incremental too.
+
+    Attributes:
+        manager: The manager that solves the affected targets.
+        store: The store of the runs of every workbook, if any.
+        workbook: The path of the opened workbook, if any.
+        previous_numbers: The keys of the numbers of the previous run.
+        previous_results: The results of the previous run by the key
+            of their target.
+    """
+
+    def __init__(
+        self,
+        manager: AbstractSubprocessManager,
+        store: Optional[SnapshotStore] = None,
+    ):
+        self.manager = manager
+        self.store = store
+        self.workbook: Optional[str] = None
+        self.previous_numbers: set[tuple] = set()
+        self.previous_results: dict[tuple, Result] = {}
+
+    def open_workbook(self, path: str):
+        """Load the previous run of the workbook from the store."""
+        self.workbook = path
+        if self.store is not None:
+            snapshot = self.store.load(path) or (set(), {})
+            self.previous_numbers, self.previous_results = snapshot
+        self.manager.open_workbook(path)
+
+    def is_running(self):
+        """Check if the subprocess is running."""
+        return self.manager.is_running()
+
+    def terminate(self):
+        """Terminate the subprocess."""
+        self.manager.terminate()
+
+    def start_calculation(
+        self,
+        executor: AbstractExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        callback: Callable[[list[Result]], None] = lambda x: None,
+        error_callback: Callable[[Exception], None] = lambda x: None,
+        interval: float = 1.0,
+    ):
+        """Keep valid results and start the calculation of others."""
+        available: dict[tuple, list[Summons]] = {}
+        for number in numbers:
+            available.setdefault(_key(number), []).append(number)
+        results: list[Optional[Result]] = [None] * len(targets)
+        claimed = set()
+        for idx, target in enumerate(targets):
+            previous = self.previous_results.get(_key(target))
+            if not previous or not previous.subset:
+                continue
+            subset = self._claim(previous.subset, available)
+            if subset is not None:
+                results[idx] = Result(target, subset)
+                claimed.update(map(id, subset))
+        affected = [idx for idx, result in enumerate(results) if not result]
+        remain = [i for i in numbers if id(i) not in claimed]
+        added = [i for i in remain if _key(i) not in self.previous_numbers]
+        kept = [i for i in remain if _key(i) in self.previous_numbers]
+        _logger.info(
+            f"Kept {len(targets) - len(affected)} results, "
+            f"solving {len(affected)} targets with {len(added)} new "
+            "summons."
+        )
+
+        def done(outcome: list[Result]):
+            for idx, result in zip(affected, outcome, strict=True):
+                results[idx] = result
+            self.previous_numbers = {_key(i) for i in numbers}
+            self.previous_results = {
+                _key(result.target): result for result in results
+            }
+            if self.store is not None and self.workbook is not None:
+                self.store.save(
+                    self.workbook,
+                    self.previous_numbers,
+                    self.previous_results,
+                )
+            callback(results)
+
+        # Even without affected targets, the wrapped manager is asked,
+        # so that the callback runs as asynchronously as ever.
+        self.manager.start_calculation(
+            executor,
+            [targets[idx] for idx in affected],
+            added + kept,
+            done,
+            error_callback,
+            interval,
+        )
+
+    @staticmethod
+    def _claim(
+        subset: list[Summons], available: dict[tuple, list[Summons]]
+    ) -> Optional[list[Summons]]:
+        """Take the current summons that equal the ones of subset.
+
+        Returns None and takes nothing if any of them is missing.
+        """
+        needed: dict[tuple, int] = {}
+        for number in subset:
+            needed[_key(number)] = needed.get(_key(number), 0) + 1
+        if any(
+            len(available.get(key, [])) < count
+            for key, count in needed.items()
+        ):
+            return None
+        return [available[_key(number)].pop(0) for number in subset]
+
+    def start_enumeration(self, *args, **kwargs):
+        """Start writing every match of the targets in a subprocess.
+
+        The previous run kept one subset per target at most, so every
+        match is searched again.
+        """
+        self.manager.start_enumeration(*args, **kwargs)
+
+    def stop_calculation(self):
+        """Stop the calculation and renew resources."""
+        self.manager.stop_calculation()
+
+    def update_status(self):
+        """Update the status of the calculation."""
+        return self.manager.update_status()
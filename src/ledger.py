@@ -0,0 +1,205 @@
+"""This module stores summons compactly for the executors."""
+
+import datetime
+import sys
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterable, Optional, Sequence
+
+from src.data_loader import Summons
+
+
+class CompactLedger:
+    """
+    Summons stored as parallel arrays of integers.
+
+    The executors search on indices and amounts only, and Summons are
+    only materialized for the subsets of Results. As long as the ledger
+    is in the process that built it, the original Summons are returned,
+    so callers can still tell them apart by identity. A pickled ledger
+    leaves the Summons behind and builds equal ones from the arrays.
+
+    Attributes:
+        amounts: The amount of every summons.
+        dates: The ordinal of the date of every summons.
+        account_ids: The index of the account of every summons in
+            accounts.
+        accounts: The distinct accounts.
+    """
+
+    def __init__(self, numbers: Iterable[Summons]):
+        self._source: Optional[list[Summons]] = list(numbers)
+        table: dict[str, int] = {}
+        self.amounts = array("q", [i.amount for i in self._source])
+        self.dates = array("q", [i.date.toordinal() for i in self._source])
+        self.account_ids = array(
+            "q",
+            [table.setdefault(i.account, len(table)) for i in self._source],
+        )
+        self.accounts = list(table)
+
+    @classmethod
+    def from_columns(
+        cls,
+        amounts: Sequence[int],
+        dates: Sequence[int],
+        account_ids: Sequence[int],
+        accounts: list[str],
+    ) -> "CompactLedger":
+        """Build a ledger on existing columns, without any Summons.
+
+        The columns may be any sequences of integers, such as
+        memoryviews of shared memory.
+        """
+        ledger = cls.__new__(cls)
+        ledger._source = None
+        ledger.amounts = amounts
+        ledger.dates = dates
+        ledger.account_ids = account_ids
+        ledger.accounts = accounts
+        return ledger
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_source"] = None
+        return state
+
+    def summons(self, idx: int) -> Summons:
+        """Return the summons at idx."""
+        if self._source is not None:
+            return self._source[idx]
+        return Summons(
+            self.accounts[self.account_ids[idx]],
+            datetime.date.fromordinal(self.dates[idx]),
+            self.amounts[idx],
+        )
+
+    def materialize(self, indices: Iterable[int]) -> list[Summons]:
+        """Return the summons at indices."""
+        return [self.summons(idx) for idx in indices]
+
+
+# The ledgers this process has attached to, by the name of the memory.
+_attached: dict[str, tuple[shared_memory.SharedMemory, CompactLedger]] = {}
+# The bytes of an integer of the columns.
+_ITEM_SIZE = array("q").itemsize
+# Whether the ledgers of other processes are attached untracked, which
+# only workers do. Set by untrack_attachments.
+_untracked = False
+
+
+def untrack_attachments():
+    """Attach to the ledgers of other processes without tracking them.
+
+    Only call it in worker processes, such as from the initializer of a
+    pool, whose ledgers are all owned by their parent.
+    """
+    global _untracked
+    _untracked = True
+
+
+def _open_untracked(name: str) -> shared_memory.SharedMemory:
+    """Open existing shared memory without the resource tracker.
+
+    Only the owner may unlink the memory, so the memory must not be
+    tracked by workers, or the tracker would unlink it once more. Before
+    Python 3.13, opening always registers the memory, and unregistering
+    it afterwards is no way out: the processes of a pool share the
+    tracker of their parent, which would forget the registration of
+    the owner as well. Registering is skipped instead, which is only
+    done in workers, see untrack_attachments. The owner registers its
+    memory when it creates it, so opening it again changes nothing.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    if not _untracked:
+        return shared_memory.SharedMemory(name=name)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _detach(name: str):
+    """Release the views of an attached ledger and close its memory."""
+    memory, ledger = _attached.pop(name)
+    for column in (ledger.amounts, ledger.dates, ledger.account_ids):
+        column.release()
+    memory.close()
+
+
+class SharedLedger:
+    """
+    A CompactLedger written once to shared memory.
+
+    The columns are copied into a single block of
+    multiprocessing.shared_memory, followed by the accounts separated
+    by newlines. The instance only pickles to the name and sizes of the
+    block, so handing a ledger to a worker costs a few bytes, and every
+    worker attaches to the same memory without copying.
+
+    The process that creates the instance owns the memory and must call
+    unlink once no worker needs it anymore.
+
+    Attributes:
+        name: The name of the shared memory.
+        size: The number of summons.
+        accounts_size: The number of bytes of the accounts.
+    """
+
+    def __init__(self, ledger: CompactLedger):
+        accounts = "\n".join(ledger.accounts).encode()
+        self.size = len(ledger)
+        self.accounts_size = len(accounts)
+        column_size = self.size * _ITEM_SIZE
+        self._memory = shared_memory.SharedMemory(
+            create=True, size=max(3 * column_size + len(accounts), 1)
+        )
+        self.name = self._memory.name
+        buffer = self._memory.buf
+        for idx, column in enumerate(
+            (ledger.amounts, ledger.dates, ledger.account_ids)
+        ):
+            start = idx * column_size
+            buffer[start : start + column_size] = array("q", column).tobytes()
+        buffer[3 * column_size : 3 * column_size + len(accounts)] = accounts
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_memory"] = None
+        return state
+
+    def attach(self) -> CompactLedger:
+        """Return a ledger whose columns are views of the memory.
+
+        A process keeps only its latest ledger attached, which pool
+        workers reuse for every task of the same ledger.
+        """
+        if self.name not in _attached:
+            for name in list(_attached):
+                _detach(name)
+            memory = _open_untracked(self.name)
+            column_size = self.size * _ITEM_SIZE
+            columns = [
+                memory.buf[i * column_size : (i + 1) * column_size].cast("q")
+                for i in range(3)
+            ]
+            start = 3 * column_size
+            accounts = bytes(memory.buf[start : start + self.accounts_size])
+            ledger = CompactLedger.from_columns(
+                *columns, accounts.decode().split("\n") if self.size else []
+            )
+            _attached[self.name] = (memory, ledger)
+        return _attached[self.name][1]
+
+    def unlink(self):
+        """Free the memory. Only call it in the process that owns it."""
+        if self.name in _attached:
+            _detach(self.name)
+        self._memory.close()
+        self._memory.unlink()
@@ -1,10 +1,27 @@
 """This module is used to output to Excel format."""
 
+from itertools import zip_longest
+from typing import Callable, Iterable
+
 import openpyxl
 from openpyxl.utils import get_column_letter
 
 from src.data_loader import AbstractDataLoader
-from src.executor import Result
+from src.executor import Result, Status
+
+STATUS_LABELS = {
+    Status.SOLVED: "已配對",
+    Status.IMPOSSIBLE: "無解",
+    Status.EXHAUSTED: "超出預算",
+}
+
+
+def count_statuses(results: list[Result]) -> str:
+    """Describe how many results there are of every status."""
+    return "，".join(
+        f"{label} {sum(1 for i in results if i.status is status)}"
+        for status, label in STATUS_LABELS.items()
+    )
 
 
 def output_excel(
@@ -57,10 +74,136 @@ def output_excel(
         # Populate target account and amount
         sheet.cell(2, start_column, result.target.account)
         sheet.cell(2, start_column + 1, result.target.amount)
+        # Populate the status and the reason below the target
+        sheet.cell(3, start_column, STATUS_LABELS[result.status])
+        if result.reason:
+            sheet.cell(4, start_column, result.reason)
 
         # Populate subset data
-        for i, number in enumerate(result.subset, start=2):
+        for i, number in enumerate(result.subset or [], start=2):
             sheet.cell(i, start_column + 2, number.account)
             sheet.cell(i, start_column + 3, number.amount)
 
     wb.save(filename)
+
+
+def _append_ledger(wb: openpyxl.Workbook, data_loader: AbstractDataLoader):
+    """Append the sheet of targets and numbers to a write-only wb."""
+    account_length = 29.0
+    amount_length = 10.0
+    sheet = wb.create_sheet()
+    for column in ("A", "D"):
+        sheet.column_dimensions[column].width = account_length
+    for column in ("B", "E"):
+        sheet.column_dimensions[column].width = amount_length
+    sheet.append(["憑證號碼", "金額", None, "憑證號碼", "金額"])
+    for target, number in zip_longest(
+        data_loader.targets, data_loader.numbers
+    ):
+        row = [None] * 5
+        if target:
+            row[0:2] = target.account, target.amount
+        if number:
+            row[3:5] = number.account, number.amount
+        sheet.append(row)
+
+
+def stream_output_excel(
+    results: list[Result],
+    data_loader: AbstractDataLoader,
+    filename: str = "ex.xlsx",
+):
+    """Write the results to Excel in write-only mode.
+
+    Unlike output_excel, every matched summons is a row of the second
+    sheet keyed by its target, so the rows are appended one after
+    another and the time and memory grow linearly with the results.
+    A target without subset is a single row with empty summons. The
+    last two columns are the status of the target and the reason.
+    """
+    account_length = 29.0
+    amount_length = 10.0
+    wb = openpyxl.Workbook(write_only=True)
+    _append_ledger(wb, data_loader)
+    # Output
+    sheet = wb.create_sheet("配對表")
+    for column in ("A", "C"):
+        sheet.column_dimensions[column].width = account_length
+    for column in ("B", "D"):
+        sheet.column_dimensions[column].width = amount_length
+    sheet.column_dimensions["F"].width = account_length
+    sheet.append(["憑證號碼", "目標值", "憑證號碼", "配對值", "狀態", "原因"])
+    for result in results:
+        target = [result.target.account, result.target.amount]
+        status = [STATUS_LABELS[result.status], result.reason or None]
+        if not result.subset:
+            sheet.append(target + [None, None] + status)
+            continue
+        for number in result.subset:
+            sheet.append(target + [number.account, number.amount] + status)
+    wb.save(filename)
+
+
+def stream_matches_excel(
+    matches: Iterable[Result],
+    data_loader: AbstractDataLoader,
+    filename: str = "ex.xlsx",
+    callback: Callable[[int], None] = lambda x: None,
+) -> int:
+    """Write the matches of BranchAndBoundExecutor.iter_matches.
+
+    The matches are consumed one by one, so they are written while
+    they are still being searched. The rows are those of
+    stream_output_excel, with the number of the match of its target in
+    the third column.
+
+    Parameters:
+        matches: The Results, where the Results of a target follow
+            each other.
+        data_loader: The data loader of the targets and numbers.
+        filename: The path of the output workbook.
+        callback: A function that is called with the number of
+            matches written so far after every match.
+
+    Returns the number of matches written.
+    """
+    account_length = 29.0
+    amount_length = 10.0
+    wb = openpyxl.Workbook(write_only=True)
+    _append_ledger(wb, data_loader)
+    sheet = wb.create_sheet("配對表")
+    for column in ("A", "D", "G"):
+        sheet.column_dimensions[column].width = account_length
+    for column in ("B", "E"):
+        sheet.column_dimensions[column].width = amount_length
+    sheet.append(
+        [
+            "憑證號碼",
+            "目標值",
+            "配對編號",
+            "憑證號碼",
+            "配對值",
+            "狀態",
+            "原因",
+        ]
+    )
+    count = 0
+    previous = None
+    for result in matches:
+        if result.target is not previous:
+            previous = result.target
+            index = 0
+        target = [result.target.account, result.target.amount]
+        status = [STATUS_LABELS[result.status], result.reason or None]
+        if not result.subset:
+            sheet.append(target + [None, None, None] + status)
+            continue
+        index += 1
+        for number in result.subset:
+            sheet.append(
+                target + [index, number.account, number.amount] + status
+            )
+        count += 1
+        callback(count)
+    wb.save(filename)
+    return count
@@ -1,35 +1,236 @@
 """This module provides a class to manage subprocesses."""
 
+import asyncio
+import copy
+import logging
 import multiprocessing
+import multiprocessing.pool
 import queue
+import threading
 import time
-from abc import abstractmethod
-from typing import Callable
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, Coroutine, Optional, Union
 
-from src.data_loader import Summons
-from src.executor import AbstractExecutor, BruteForceExecutor, Result
+from src.data_loader import AbstractDataLoader, Summons
+from src.executor import (
+    AbstractExecutor,
+    BranchAndBoundExecutor,
+    BruteForceExecutor,
+    CandidatePool,
+    Result,
+    SequentialExecutor,
+    Status,
+    count_combinations,
+    order_targets,
+)
+from src.ledger import CompactLedger, SharedLedger, untrack_attachments
+from src.output import stream_matches_excel
+
+_logger = logging.getLogger(__name__)
+
+# The shared progress and generation of the worker, set by _init_worker.
+_progress = None
+_generation = None
+
+
+class Cancelled(Exception):
+    """Raised in a worker whose calculation has been stopped."""
+
+
+def _init_worker(progress, generation=None):
+    """Keep the shared values. Use as the initializer of a pool.
+
+    Shared values can only be handed to workers when they start. The
+    worker also attaches to the SharedLedgers of its parent untracked.
+
+    Parameters:
+        progress: The shared progress of the current calculation, or
+            an array of the progress of every slot.
+        generation: The shared generation of the current calculation,
+            which the manager advances to cancel it, or an array of
+            the generation of every slot.
+    """
+    global _progress, _generation
+    _progress = progress
+    _generation = generation
+    untrack_attachments()
+
+
+def _reporter(
+    generation: Optional[int] = None, slot: Optional[int] = None
+) -> Callable[[float], None]:
+    """Return a callback that writes the progress of a calculation.
+
+    The executors call it once per PROGRESS_BATCH, which makes it the
+    place to poll for cancellation: once the shared generation has
+    moved past the given one, the callback raises Cancelled, which
+    unwinds the executor and leaves the worker free for the next task.
+    With a slot, the shared values are arrays and only the slot is
+    used.
+    """
+
+    def callback(progress: float):
+        if generation is not None and _generation is not None:
+            current = _generation.value if slot is None else _generation[slot]
+            if current != generation:
+                raise Cancelled(f"Calculation {generation} is cancelled.")
+        if _progress is not None:
+            if slot is None:
+                _progress.value = progress
+            else:
+                _progress[slot] = progress
+
+    return callback
 
 
 def _calculate(
-    executor: BruteForceExecutor,
-    queue: multiprocessing.Queue,
+    executor: AbstractExecutor,
     targets: list[Summons],
     numbers: list[Summons],
-    interval: float = 1.0,
+    generation: Optional[int] = None,
+    slot: Optional[int] = None,
 ):
     """Calculate all subset sum. Use as a child process."""
+    callback = _reporter(generation, slot)
+    # A task that waited behind a cancelled one may be cancelled too.
+    callback(0.0)
+    return executor.calculate_all(targets, numbers, callback)
+
+
+def _solve_indices(
+    executor: AbstractExecutor,
+    target: Summons,
+    shared: SharedLedger,
+    indices: list[int],
+    callback: Callable[[float], None],
+) -> tuple[Optional[list[int]], Status, str]:
+    """Solve target on the summons of shared at indices.
+
+    Returns the indices of the subset in shared instead of the subset,
+    so the parent can map them back to its own summons, along with the
+    status and the reason of the result.
+    """
+    numbers = shared.attach().materialize(indices)
+    result = executor.calculate_all([target], numbers, callback)[0]
+    position = {id(number): i for i, number in zip(indices, numbers)}
+    subset = result.subset and [position[id(i)] for i in result.subset]
+    return subset, result.status, result.reason
+
+
+def _solve_target(
+    executor: SequentialExecutor,
+    target: Summons,
+    shared: SharedLedger,
+    indices: list[int],
+    generation: Optional[int] = None,
+    slot: Optional[int] = None,
+) -> tuple[Optional[list[int]], Status, str]:
+    """Solve a single target. Use as a child process.
+
+    The candidates of target are the summons of shared at indices, so
+    the task carries only the indices instead of the summons. Returns
+    the outcome of _solve_indices.
+    """
+    callback = _reporter(generation, slot)
+    callback(0.0)
+    return _solve_indices(executor, target, shared, indices, callback)
+
+
+def _search(
+    executor: BruteForceExecutor,
+    queue: multiprocessing.Queue,
+    found,
+    task: tuple,
+    interval: float = 1.0,
+) -> Result:
+    """Search one part of the combinations. Use as a child process.
+
+    Parameters:
+        executor: The executor that searches.
+        queue: The queue that receives (task id, combinations searched)
+            pairs.
+        found: An event that is set once any part finds a subset.
+        task: A (task id, target, SharedLedger, sizes) tuple.
+        interval: The minimum number of seconds between two progress
+            reports.
+    """
+    task_id, target, shared, sizes = task
+    if found.is_set():
+        return Result(target, None)
+    start_time = time.time()
+    executor._init_status()
+    executor._total_calculation = 1
+
+    def callback(progress: float):
+        nonlocal start_time
+        if time.time() - start_time > interval:
+            queue.put((task_id, executor._already_calculation))
+            start_time = time.time()
+
+    result = executor.search(
+        target, shared.attach(), sizes, callback, should_stop=found.is_set
+    )
+    done = executor._already_calculation + executor._pending_calculation
+    queue.put((task_id, done))
+    return result
+
+
+def _solve(
+    executor: AbstractExecutor,
+    queue: multiprocessing.Queue,
+    task: tuple,
+    interval: float = 1.0,
+) -> tuple[int, Result]:
+    """Solve a single target. Use as a child process.
+
+    Parameters:
+        executor: The executor that solves the target.
+        queue: The queue that receives (target index, progress) pairs.
+        task: A (target index, target, SharedLedger, indices) tuple,
+            where the candidates of the target are the summons of the
+            ledger at indices.
+        interval: The minimum number of seconds between two progress
+            reports.
+
+    Returns the target index along with the outcome of _solve_target.
+    """
+    index, target, shared, indices = task
     start_time = time.time()
 
     def callback(progress: float):
         nonlocal start_time
         if time.time() - start_time > interval:
-            queue.put(progress)
+            queue.put((index, progress))
             start_time = time.time()
 
-    return executor.calculate_all(targets, numbers, callback=callback)
+    outcome = _solve_indices(executor, target, shared, indices, callback)
+    queue.put((index, 1.0))
+    return index, outcome
+
+
+def _enumerate(
+    executor: BranchAndBoundExecutor,
+    targets: list[Summons],
+    numbers: list[Summons],
+    data_loader: AbstractDataLoader,
+    filename: str,
+    limit: Optional[int] = None,
+    generation: Optional[int] = None,
+    slot: Optional[int] = None,
+) -> int:
+    """Write the matches of targets to Excel. Use as a child process.
+
+    Returns the number of matches written.
+    """
+    callback = _reporter(generation, slot)
+    callback(0.0)
+    matches = executor.iter_matches(targets, numbers, limit, callback)
+    return stream_matches_excel(matches, data_loader, filename)
 
 
-class AbstractSubprocessManager:
+class AbstractSubprocessManager(ABC):
     @abstractmethod
     def is_running(self):
         """Check if the subprocess is running."""
@@ -50,6 +251,31 @@ class AbstractSubprocessManager:
     ):
         """Start the calculation in a subprocess."""
 
+    @abstractmethod
+    def start_enumeration(
+        self,
+        executor: BranchAndBoundExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        data_loader: AbstractDataLoader,
+        filename: str,
+        limit: Optional[int],
+        callback: Callable[[int], None],
+        error_callback: Callable[[Exception], None],
+        interval: float,
+    ):
+        """Start writing every match of the targets in a subprocess.
+
+        The callback receives the number of matches written.
+        """
+
+    def open_workbook(self, path: str):  # noqa: B027
+        """Tell the manager which workbook the next calculations are of.
+
+        Managers that keep state between runs use it to find the state
+        of the workbook. The others ignore it.
+        """
+
     @abstractmethod
     def stop_calculation(self):
         """Stop the calculation and renew resources."""
@@ -59,11 +285,50 @@ class AbstractSubprocessManager:
         """Update the status of the calculation."""
 
 
-class SubprocessManager:
+class SubprocessManager(AbstractSubprocessManager):
+    """
+    Subprocess manager that runs one calculation in a pool.
+
+    The worker writes its progress into a shared double, which
+    update_status reads. A write is a plain store into shared memory,
+    so it costs the same no matter how often the executor reports, and
+    a read always returns the latest progress.
+
+    The pool is created once and kept warm. Every calculation is tagged
+    with the shared generation it started in, and stopping it only
+    advances the generation. The worker notices at its next report and
+    gives up with Cancelled, which is never passed to the callbacks, so
+    a stop costs at most one PROGRESS_BATCH of work instead of
+    spawning a new pool.
+
+    Attributes:
+        progress: The shared progress of the current calculation.
+        generation: The shared generation of the current calculation.
+    """
+
     def __init__(self):
         self.async_result = None
-        self.queue = multiprocessing.Manager().Queue()
-        self.pool = multiprocessing.Pool()
+        self.progress = multiprocessing.Value("d", 0.0, lock=False)
+        self.generation = multiprocessing.Value("q", 0, lock=False)
+        self.pool = self._create_pool()
+
+    def _create_pool(self) -> multiprocessing.pool.Pool:
+        """Create a pool whose workers share the progress values."""
+        return multiprocessing.Pool(
+            initializer=_init_worker,
+            initargs=(self.progress, self.generation),
+        )
+
+    def _current(self, generation: int, callback: Callable) -> Callable:
+        """Wrap callback to drop the outcome of a stopped task."""
+
+        def wrapper(outcome):
+            # A stopped calculation ends with Cancelled or, if it
+            # finished before noticing, with an outdated result.
+            if self.generation.value == generation:
+                callback(outcome)
+
+        return wrapper
 
     def terminate(self):
         """Terminate the subprocess."""
@@ -82,23 +347,744 @@ class SubprocessManager:
         error_callback: Callable[[Exception], None] = lambda x: None,
         interval: float = 1.0,
     ):
-        """Start the calculation in a subprocess."""
+        """Start the calculation in a subprocess.
+
+        The interval is not needed, because reporting progress costs a
+        single store into shared memory.
+        """
+        self.progress.value = 0.0
+        generation = self.generation.value
         self.async_result = self.pool.apply_async(
             _calculate,
-            (executor, self.queue, targets, numbers, interval),
-            callback=callback,
-            error_callback=error_callback,
+            (executor, targets, numbers, generation),
+            callback=self._current(generation, callback),
+            error_callback=self._current(generation, error_callback),
+        )
+
+    def start_enumeration(
+        self,
+        executor: BranchAndBoundExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        data_loader: AbstractDataLoader,
+        filename: str,
+        limit: Optional[int] = None,
+        callback: Callable[[int], None] = lambda x: None,
+        error_callback: Callable[[Exception], None] = lambda x: None,
+        interval: float = 1.0,
+    ):
+        """Start writing every match of the targets in a subprocess.
+
+        See BranchAndBoundExecutor.iter_matches for the matches and
+        stream_matches_excel for the output.
+        """
+        self.progress.value = 0.0
+        generation = self.generation.value
+        self.async_result = self.pool.apply_async(
+            _enumerate,
+            (
+                executor,
+                targets,
+                numbers,
+                data_loader,
+                filename,
+                limit,
+                generation,
+            ),
+            callback=self._current(generation, callback),
+            error_callback=self._current(generation, error_callback),
         )
 
     def stop_calculation(self):
-        """Stop the calculation and renew resources."""
-        self.pool.terminate()
+        """Cancel the calculation and keep the pool for the next one."""
+        self.generation.value += 1
         self.async_result = None
-        self.pool = multiprocessing.Pool()
-        self.queue = multiprocessing.Manager().Queue()
+        self.progress.value = 0.0
 
     def update_status(self):
+        """Return the latest progress of the calculation."""
+        return self.progress.value
+
+
+class ParallelSubprocessManager(AbstractSubprocessManager):
+    """
+    Subprocess manager that splits the search of each target.
+
+    Every combination size r of a target is a separate task, and the
+    tasks are spread over all workers of the pool. The first task that
+    finds a subset sets a shared event, which makes its siblings give
+    up. Only BruteForceExecutor can be split this way.
+    """
+
+    # The executors that the manager can run.
+    executor_types: tuple[type[AbstractExecutor], ...] = (BruteForceExecutor,)
+
+    def __init__(self):
+        self.async_result = None
+        self.pool = self._create_pool()
+        self.sync_manager = multiprocessing.Manager()
+        self.queue = self.sync_manager.Queue()
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.found = None
+        self.progress = {}
+        self.total = 1
+
+    @staticmethod
+    def _create_pool() -> multiprocessing.pool.Pool:
+        """Create a pool whose workers attach to the shared ledgers."""
+        return multiprocessing.Pool(initializer=_init_worker, initargs=(None,))
+
+    def is_running(self):
+        """Check if the subprocess is running."""
+        return self.thread is not None and self.thread.is_alive()
+
+    def terminate(self):
+        """Terminate the subprocess."""
+        self.stop_event.set()
+        self.pool.terminate()
+        self.sync_manager.shutdown()
+
+    def _wait(self, get: Callable[..., object]):
+        """Wait for the next result of the pool.
+
+        Parameters:
+            get: A function that takes a timeout and returns the next
+                result, such as the next method of imap iterators.
+
+        Returns None if the calculation is stopped while waiting.
+        """
+        while not self.stop_event.is_set():
+            try:
+                return get(timeout=0.1)
+            except multiprocessing.TimeoutError:
+                continue
+        return None
+
+    def _search_target(
+        self,
+        executor: BruteForceExecutor,
+        index: int,
+        target: Summons,
+        numbers: list[Summons],
+        interval: float,
+    ) -> Result:
+        """Search one target with all workers of the pool.
+
+        Parameters:
+            executor: The executor that searches.
+            index: The index of target, used to label the tasks.
+            target: The target that we want to solve.
+            numbers: The subset where we search for the sum
+                of its subset is equal to target.
+            interval: The minimum number of seconds between two
+                progress reports of a task.
+        """
+        # The ledger is written to shared memory once, so every task
+        # only carries its name.
+        shared = SharedLedger(
+            CompactLedger(i for i in numbers if i.amount <= target.amount)
+        )
+        self.found = self.sync_manager.Event()
+        tasks = [
+            ((index, r), target, shared, [r])
+            for r in range(1, shared.size + 1)
+        ]
+        search = partial(
+            _search, executor, self.queue, self.found, interval=interval
+        )
+        found = None
+        try:
+            iterator = self.pool.imap_unordered(search, tasks)
+            # Every task is drained, even after a hit, so that no task
+            # outlives the event and the ledger of its target. The
+            # siblings of a hit give up at their next check.
+            for _ in tasks:
+                result = self._wait(iterator.next)
+                if result is None:
+                    return Result(target, None)
+                if result.subset and found is None:
+                    found = result
+                    self.found.set()
+            return found or Result(target, None)
+        finally:
+            shared.unlink()
+
+    def _estimate(self, targets: list[Summons], numbers: list[Summons]) -> int:
+        """Estimate the total progress reported by all tasks."""
+        total = 0
+        for target in targets:
+            n = len([i for i in numbers if i.amount <= target.amount])
+            total += count_combinations(n, range(1, n + 1))
+        return total
+
+    def _solve_all(
+        self,
+        executor: AbstractExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        interval: float,
+    ) -> list[Result]:
+        """Search all targets one after another."""
+        results = []
+        pool = CandidatePool(numbers)
+        for index, target in enumerate(targets):
+            result = self._search_target(
+                executor,
+                index,
+                target,
+                executor.candidates(target, pool),
+                interval,
+            )
+            if self.stop_event.is_set():
+                break
+            results.append(result)
+            if result.subset:
+                pool.remove(self._identify(result.subset, pool))
+        return results
+
+    @staticmethod
+    def _identify(subset: list[Summons], pool: CandidatePool) -> list[Summons]:
+        """Find the summons of pool that equal the copies in subset.
+
+        The results of workers are pickled copies of the summons.
+        """
+        remain = list(pool)
+        found = []
+        for number in subset:
+            found.append(remain.pop(remain.index(number)))
+        return found
+
+    def _run(
+        self,
+        work: Callable[[], object],
+        callback: Callable[[object], None],
+        error_callback: Callable[[Exception], None],
+    ):
+        """Run work and report its outcome. Run in a thread."""
         try:
-            return self.queue.get_nowait()
-        except queue.Empty:
+            outcome = work()
+        except Exception as e:
+            error_callback(e)
+            return
+        if not self.stop_event.is_set():
+            callback(outcome)
+
+    def _start(
+        self,
+        work: Callable[[], object],
+        callback: Callable[[object], None],
+        error_callback: Callable[[Exception], None],
+    ):
+        """Run work in a thread that reports its outcome."""
+        self.stop_event = threading.Event()
+        self.progress = {}
+        self.thread = threading.Thread(
+            target=self._run,
+            args=(work, callback, error_callback),
+            daemon=True,
+        )
+        self.thread.start()
+
+    def start_calculation(
+        self,
+        executor: AbstractExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        callback: Callable[[list[Result]], None] = lambda x: None,
+        error_callback: Callable[[Exception], None] = lambda x: None,
+        interval: float = 1.0,
+    ):
+        """Start the calculation in a subprocess.
+
+        Raises TypeError if the manager cannot run the executor.
+        """
+        if not isinstance(executor, self.executor_types):
+            raise TypeError(
+                f"{type(self).__name__} cannot run "
+                f"{type(executor).__name__}."
+            )
+        self.total = max(self._estimate(targets, numbers), 1)
+        self._start(
+            partial(self._solve_all, executor, targets, numbers, interval),
+            callback,
+            error_callback,
+        )
+
+    def start_enumeration(
+        self,
+        executor: BranchAndBoundExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        data_loader: AbstractDataLoader,
+        filename: str,
+        limit: Optional[int] = None,
+        callback: Callable[[int], None] = lambda x: None,
+        error_callback: Callable[[Exception], None] = lambda x: None,
+        interval: float = 1.0,
+    ):
+        """Start writing every match of the targets in a subprocess.
+
+        The matches are written in order, so the enumeration is a single
+        task of the pool, as in SubprocessManager, and reports no
+        progress.
+        """
+        self.total = 1
+        result = self.pool.apply_async(
+            _enumerate,
+            (executor, targets, numbers, data_loader, filename, limit),
+        )
+        self._start(partial(self._wait, result.get), callback, error_callback)
+
+    def stop_calculation(self):
+        """Stop the calculation and renew resources."""
+        self.stop_event.set()
+        if self.found is not None:
+            self.found.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.pool.terminate()
+        self.pool = self._create_pool()
+        self.queue = self.sync_manager.Queue()
+
+    def update_status(self):
+        """Merge the progress of all tasks into a single float."""
+        updated = False
+        while True:
+            try:
+                task_id, count = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            self.progress[task_id] = count
+            updated = True
+        if not updated:
             return None
+        return sum(self.progress.values()) / self.total
+
+
+class ScheduledSubprocessManager(ParallelSubprocessManager):
+    """
+    Subprocess manager that solves every target in its own worker.
+
+    The targets are independent except that a summons can match only
+    one target. They are sent to the pool with the most constrained
+    targets, those with the fewest candidates, first. Once all workers
+    are done, a deterministic pass in the parent accepts the results in
+    the order of targets and solves again only the targets whose
+    summons were already claimed by an earlier target.
+
+    The tasks run at once, so they never use the checkpoint of the
+    executor: they would all save to and clear the same file.
+    """
+
+    executor_types = (AbstractExecutor,)
+
+    def _estimate(self, targets: list[Summons], numbers: list[Summons]) -> int:
+        # Every task reports its own progress between 0 and 1.
+        return len(targets)
+
+    def _solve_all(
+        self,
+        executor: AbstractExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        interval: float,
+    ) -> list[Result]:
+        if getattr(executor, "checkpoint", None) is not None:
+            executor = copy.copy(executor)
+            executor.checkpoint = None
+        position = {id(number): i for i, number in enumerate(numbers)}
+        pool = CandidatePool(numbers)
+        candidates = []
+        for target in targets:
+            subset = numbers
+            if isinstance(executor, SequentialExecutor):
+                subset = executor.candidates(target, pool)
+            candidates.append(
+                [position[id(i)] for i in subset if i.amount <= target.amount]
+            )
+        # The ledger is written to shared memory once, so every task
+        # only carries the indices of its candidates.
+        shared = SharedLedger(CompactLedger(numbers))
+        try:
+            tasks = [
+                (index, target, shared, candidates[index])
+                for index, target in enumerate(targets)
+            ]
+            tasks.sort(key=lambda x: (len(x[3]), x[1].amount))
+            solve = partial(_solve, executor, self.queue, interval=interval)
+            iterator = self.pool.imap_unordered(solve, tasks)
+            outcomes = [None] * len(targets)
+            for _ in tasks:
+                outcome = self._wait(iterator.next)
+                if outcome is None:
+                    return []
+                index, outcomes[index] = outcome
+            # Accept the results in order and collect the conflicts.
+            available = set(range(len(numbers)))
+            conflicts = []
+            for index, (subset, _, _) in enumerate(outcomes):
+                if subset and not self._claim(subset, available):
+                    conflicts.append(index)
+            for index in conflicts:
+                _logger.info(
+                    f"Target: {targets[index].amount} conflicts with "
+                    "earlier targets, solving it again."
+                )
+                indices = [i for i in candidates[index] if i in available]
+                task = (index, targets[index], shared, indices)
+                outcome = self._wait(
+                    self.pool.apply_async(
+                        _solve, (executor, self.queue, task)
+                    ).get
+                )
+                if outcome is None:
+                    return []
+                outcomes[index] = outcome[1]
+                if outcomes[index][0]:
+                    self._claim(outcomes[index][0], available)
+        finally:
+            shared.unlink()
+        return [
+            Result(target, subset and [numbers[i] for i in subset], *rest)
+            for target, (subset, *rest) in zip(targets, outcomes)
+        ]
+
+    @staticmethod
+    def _claim(subset: list[int], available: set[int]) -> bool:
+        """Remove subset from available if none of it is claimed yet.
+
+        Parameters:
+            subset: The indices of the summons of a result.
+            available: The indices of the summons not claimed yet.
+
+        Returns True if the subset is claimed, False otherwise. The
+        available set is left unchanged if the subset is not claimed.
+        """
+        if not available.issuperset(subset):
+            return False
+        available.difference_update(subset)
+        return True
+
+
+class AsyncSubprocessManager(AbstractSubprocessManager):
+    """
+    Subprocess manager for asyncio applications.
+
+    The calculations run on a ProcessPoolExecutor through
+    loop.run_in_executor, so a single event loop can drive many of them
+    at once. `stream` yields the progress and the Results of a
+    calculation as they come, and `run` returns all Results at once.
+
+    Every calculation holds a slot of two shared arrays while it runs:
+    the worker writes its progress into the slot, and the manager
+    advances the generation of the slot to cancel it, as in
+    SubprocessManager. At most `slots` calculations run at once, and
+    the others wait for a free slot.
+
+    A SequentialExecutor solves one target per task, with the summons
+    of every matched target removed from the candidates of the targets
+    that follow, so every Result is yielded as soon as its target is
+    solved. Other executors solve all targets at once in a single task,
+    and their Results are yielded together once it finishes.
+
+    The methods of AbstractSubprocessManager must be called from the
+    thread of the event loop.
+
+    Attributes:
+        progress: The shared progress of every slot.
+        generation: The shared generation of every slot.
+        pool: The pool of workers.
+        task: The task of the calculation started by
+            start_calculation or start_enumeration.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, slots: int = 64):
+        """Initialize the manager.
+
+        Parameters:
+            max_workers: The number of workers of the pool, or the
+                number of CPUs if None.
+            slots: The number of calculations that may run at once.
+        """
+        self.progress = multiprocessing.Array("d", slots, lock=False)
+        self.generation = multiprocessing.Array("q", slots, lock=False)
+        self.pool = ProcessPoolExecutor(
+            max_workers,
+            initializer=_init_worker,
+            initargs=(self.progress, self.generation),
+        )
+        self._slots = asyncio.Queue()
+        for slot in range(slots):
+            self._slots.put_nowait(slot)
+        self.task = None
+        self._status = None
+
+    async def _watch(
+        self,
+        future: asyncio.Future,
+        slot: int,
+        done: float,
+        share: float,
+        interval: float,
+    ) -> AsyncIterator[float]:
+        """Yield the progress of slot until future is done.
+
+        The progress of the slot is scaled to share and added to done,
+        and is only yielded once per interval and if it changed.
+        """
+        last = None
+        while True:
+            finished, _ = await asyncio.wait({future}, timeout=interval)
+            if finished:
+                return
+            progress = done + self.progress[slot] * share
+            if progress != last:
+                last = progress
+                yield progress
+
+    async def stream(
+        self,
+        executor: AbstractExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        interval: float = 1.0,
+    ) -> AsyncIterator[Union[float, Result]]:
+        """Calculate all subset sum and yield the outcome as it comes.
+
+        Parameters:
+            executor: The executor that solves the targets.
+            targets: The list of targets.
+            numbers: The candidate numbers of all targets.
+            interval: The seconds between two reports of progress.
+
+        Yields the progress of the calculation between 0 and 1, at most
+        once per interval, and the Result of every target once it is
+        known. If the iteration stops early, the calculation is
+        cancelled at its next report.
+        """
+        loop = asyncio.get_running_loop()
+        slot = await self._slots.get()
+        generation = self.generation[slot]
+        self.progress[slot] = 0.0
+        future = None
+        shared = None
+        try:
+            if not isinstance(executor, SequentialExecutor):
+                future = loop.run_in_executor(
+                    self.pool,
+                    _calculate,
+                    executor,
+                    targets,
+                    numbers,
+                    generation,
+                    slot,
+                )
+                async for progress in self._watch(
+                    future, slot, 0.0, 1.0, interval
+                ):
+                    yield progress
+                for target, result in zip(targets, await future):
+                    yield Result(
+                        target, result.subset, result.status, result.reason
+                    )
+                return
+            pool = CandidatePool(numbers)
+            position = {id(number): i for i, number in enumerate(numbers)}
+            # The ledger is written to shared memory once, so every task
+            # only carries the indices of its candidates.
+            shared = SharedLedger(CompactLedger(numbers))
+            share = 1 / max(len(targets), 1)
+            order = order_targets(targets, numbers, executor.order)
+            for done, idx in enumerate(order):
+                target = targets[idx]
+                candidates = executor.candidates(target, pool)
+                self.progress[slot] = 0.0
+                future = loop.run_in_executor(
+                    self.pool,
+                    _solve_target,
+                    executor,
+                    target,
+                    shared,
+                    [position[id(i)] for i in candidates],
+                    generation,
+                    slot,
+                )
+                async for progress in self._watch(
+                    future, slot, done * share, share, interval
+                ):
+                    yield progress
+                indices, status, reason = await future
+                subset = indices and [numbers[i] for i in indices]
+                if subset:
+                    pool.remove(subset)
+                yield Result(target, subset, status, reason)
+        finally:
+            if future is not None and not future.done():
+                # Cancel the task in the worker and forget its outcome.
+                self.generation[slot] += 1
+                future.cancel()
+            if shared is not None:
+                shared.unlink()
+            self._slots.put_nowait(slot)
+
+    async def run(
+        self,
+        executor: AbstractExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        callback: Callable[[float], None] = lambda x: None,
+        interval: float = 1.0,
+    ) -> list[Result]:
+        """Calculate all subset sum.
+
+        Returns the Results in the order of targets, like
+        AbstractExecutor.calculate_all. The callback receives the
+        progress, as yielded by stream.
+        """
+        results = {}
+        async for item in self.stream(executor, targets, numbers, interval):
+            if isinstance(item, Result):
+                results[id(item.target)] = item
+            else:
+                callback(item)
+        return [results[id(target)] for target in targets]
+
+    async def write_matches(
+        self,
+        executor: BranchAndBoundExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        data_loader: AbstractDataLoader,
+        filename: str,
+        limit: Optional[int] = None,
+        callback: Callable[[float], None] = lambda x: None,
+        interval: float = 1.0,
+    ) -> int:
+        """Write every match of the targets to Excel.
+
+        See BranchAndBoundExecutor.iter_matches for the matches and
+        stream_matches_excel for the output. The callback receives the
+        progress at most once per interval.
+
+        Returns the number of matches written.
+        """
+        loop = asyncio.get_running_loop()
+        slot = await self._slots.get()
+        generation = self.generation[slot]
+        self.progress[slot] = 0.0
+        future = None
+        try:
+            future = loop.run_in_executor(
+                self.pool,
+                _enumerate,
+                executor,
+                targets,
+                numbers,
+                data_loader,
+                filename,
+                limit,
+                generation,
+                slot,
+            )
+            async for progress in self._watch(
+                future, slot, 0.0, 1.0, interval
+            ):
+                callback(progress)
+            return await future
+        finally:
+            if future is not None and not future.done():
+                self.generation[slot] += 1
+                future.cancel()
+            self._slots.put_nowait(slot)
+
+    def is_running(self):
+        """Check if the task of the manager is running."""
+        return self.task is not None and not self.task.done()
+
+    def terminate(self):
+        """Cancel all calculations and shut down the pool."""
+        self.stop_calculation()
+        for slot in range(len(self.generation)):
+            self.generation[slot] += 1
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def start_calculation(
+        self,
+        executor: AbstractExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        callback: Callable[[list[Result]], None] = lambda x: None,
+        error_callback: Callable[[Exception], None] = lambda x: None,
+        interval: float = 1.0,
+    ):
+        """Start the calculation in a task of the running event loop."""
+        self._start(
+            self.run(executor, targets, numbers, self._update, interval),
+            callback,
+            error_callback,
+        )
+
+    def start_enumeration(
+        self,
+        executor: BranchAndBoundExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        data_loader: AbstractDataLoader,
+        filename: str,
+        limit: Optional[int] = None,
+        callback: Callable[[int], None] = lambda x: None,
+        error_callback: Callable[[Exception], None] = lambda x: None,
+        interval: float = 1.0,
+    ):
+        """Start write_matches in a task of the running event loop."""
+        self._start(
+            self.write_matches(
+                executor,
+                targets,
+                numbers,
+                data_loader,
+                filename,
+                limit,
+                self._update,
+                interval,
+            ),
+            callback,
+            error_callback,
+        )
+
+    def _update(self, progress: float):
+        """Keep the progress for update_status."""
+        self._status = progress
+
+    def _start(
+        self,
+        coroutine: Coroutine,
+        callback: Callable[[object], None],
+        error_callback: Callable[[Exception], None],
+    ):
+        """Run coroutine in a task and report its outcome."""
+        self._status = None
+
+        def done(task: asyncio.Task):
+            if task.cancelled():
+                return
+            if task.exception() is not None:
+                error_callback(task.exception())
+            else:
+                callback(task.result())
+
+        self.task = asyncio.get_running_loop().create_task(coroutine)
+        self.task.add_done_callback(done)
+
+    def stop_calculation(self):
+        """Cancel the task of the manager."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self._status = None
+
+    def update_status(self):
+        """Return the latest progress of the task, if any."""
+        return self._status
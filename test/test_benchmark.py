@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+import src.executor
+from src.benchmark import SyntheticDataLoader, executor_classes, run_benchmark
+from src.executor import (
+    BitsetExecutor,
+    BranchAndBoundExecutor,
+    BruteForceExecutor,
+    DynamicProgrammingExecutor,
+    MeetInTheMiddleExecutor,
+    PlannedExecutor,
+    Status,
+    VectorizedExecutor,
+)
+
+
+def test_synthetic_data_loader():
+    """Verify that the synthetic ledger is seeded and as promised."""
+    data_loader = SyntheticDataLoader(
+        size=14, subset_size=3, solvable=2, unsolvable=2, seed=7
+    )
+    again = SyntheticDataLoader(
+        size=14, subset_size=3, solvable=2, unsolvable=2, seed=7
+    )
+    assert data_loader.targets == again.targets
+    assert data_loader.numbers == again.numbers
+    assert len(data_loader.numbers) == 14
+    assert all(number.amount % 10 == 0 for number in data_loader.numbers)
+    results = BranchAndBoundExecutor(order="amount").calculate_all(
+        data_loader.targets, data_loader.numbers
+    )
+    statuses = [result.status for result in results]
+    assert statuses.count(Status.IMPOSSIBLE) == 2
+    for result in results:
+        assert (result.status is Status.SOLVED) == (
+            result.target.amount % 10 == 0
+        )
+
+
+def test_executor_classes():
+    """Verify that the benchmark finds every executor and no fakes."""
+    assert set(executor_classes()) == {
+        BitsetExecutor,
+        BranchAndBoundExecutor,
+        BruteForceExecutor,
+        DynamicProgrammingExecutor,
+        MeetInTheMiddleExecutor,
+        PlannedExecutor,
+        VectorizedExecutor,
+    }
+
+
+def test_run_benchmark(tmp_path: Path):
+    """Verify that run_benchmark records every executor and ledger."""
+    output = tmp_path / "benchmark.json"
+    run_benchmark(sizes=(8, 10), subset_sizes=(2,), output=str(output))
+    with open(output, encoding="utf-8") as file:
+        records = json.load(file)["results"]
+    executors = len(executor_classes()) - (src.executor.np is None)
+    assert len(records) == 2 * executors
+    for record in records:
+        assert record["correct"]
+        assert record["work"] > 0
+        assert record["peak_bytes"] > 0
+        assert record["solved"] + record["impossible"] == 3
@@ -0,0 +1,97 @@
+import datetime
+from pathlib import Path
+
+from src.cache import CachedSubprocessManager, ResultCache, cache_key
+from src.data_loader import Summons
+from src.executor import (
+    BruteForceExecutor,
+    DateWindow,
+    DynamicProgrammingExecutor,
+)
+from test.utils import FakeDataLoader, SynchronousSubprocessManager
+
+
+def test_cache_key():
+    """Verify that cache_key ignores amounts larger than the target."""
+    executor = BruteForceExecutor()
+    target = Summons("target", datetime.date(2020, 1, 1), 5)
+    key = cache_key(executor, target, [1, 2, 5])
+    assert key == cache_key(executor, target, [1, 2, 5, 6, 9])
+    assert key != cache_key(executor, target, [1, 2, 4])
+    assert key != cache_key(DynamicProgrammingExecutor(), target, [1, 2, 5])
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path: Path):
+    """Verify that ResultCache evicts the oldest entries when full."""
+    cache = ResultCache(tmp_path / "cache.sqlite3", max_bytes=15)
+    cache.put("a", [1, 2])
+    cache.put("b", [3, 4])
+    assert cache.get("a") == [1, 2]
+    cache.put("c", [5, 6])
+    assert cache.get("a") == [1, 2]
+    assert cache.get("b") is None
+    assert cache.get("c") == [5, 6]
+
+
+def test_cached_subprocess_manager(tmp_path: Path):
+    """Verify that solved targets are answered from the cache.
+
+    The second run must only send the new target to the wrapped
+    manager, and must not offer the summons of cached subsets to it.
+    """
+    results = None
+
+    def get_results(outcome):
+        nonlocal results
+        results = outcome
+
+    data_loader = FakeDataLoader()
+    inner = SynchronousSubprocessManager()
+    manager = CachedSubprocessManager(
+        inner, ResultCache(tmp_path / "cache.sqlite3")
+    )
+    executor = BruteForceExecutor()
+    targets = data_loader.targets
+    manager.start_calculation(
+        executor, targets, data_loader.numbers, get_results
+    )
+    first = results
+    new_target = Summons("new", datetime.date(2020, 1, 2), 3)
+    manager.start_calculation(
+        executor, targets + [new_target], data_loader.numbers, get_results
+    )
+    assert inner.targets == [new_target]
+    assert [x.amount for x in results[0].subset] == [
+        x.amount for x in first[0].subset
+    ]
+    assert not set(map(id, results[0].subset)) & set(map(id, inner.numbers))
+    assert sum([x.amount for x in results[1].subset]) == 3
+
+
+def test_cached_subprocess_manager_window(tmp_path: Path):
+    """Verify that a windowed run only gets subsets within its window.
+
+    Both numbers match the target, but only the second one is dated
+    within the window. A run without window caches the first one,
+    which the windowed run must not reuse.
+    """
+    results = None
+
+    def get_results(outcome):
+        nonlocal results
+        results = outcome
+
+    date = datetime.date(2020, 1, 1)
+    target = Summons("target", date, 5)
+    outside = Summons("outside", date + datetime.timedelta(days=10), 5)
+    inside = Summons("inside", date, 5)
+    cache = ResultCache(tmp_path / "cache.sqlite3")
+    windowed = BruteForceExecutor(window=DateWindow(0, 0))
+    for executor in (BruteForceExecutor(), windowed, windowed):
+        inner = SynchronousSubprocessManager()
+        manager = CachedSubprocessManager(inner, cache)
+        manager.start_calculation(
+            executor, [target], [outside, inside], get_results
+        )
+    assert results[0].subset[0] is inside
+    assert inner.targets == []
@@ -0,0 +1,84 @@
+import datetime
+import pickle
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.checkpoint import CheckpointStore, save_atomically
+from src.data_loader import Summons
+from src.executor import (
+    AbstractExecutor,
+    BranchAndBoundExecutor,
+    BruteForceExecutor,
+)
+
+
+class Interrupt(Exception):
+    """Raised by a callback to simulate a stopped calculation."""
+
+
+def test_checkpoint_store(tmp_path: Path):
+    """Verify that CheckpointStore only loads its own calculation."""
+    store = CheckpointStore(tmp_path / "checkpoint.pickle")
+    assert store.load("a") is None
+    store.save("a", {"current": 1})
+    assert store.load("a") == {"current": 1}
+    assert store.load("b") is None
+    store.clear()
+    assert store.load("a") is None
+    store.clear()
+
+
+def test_save_atomically(tmp_path: Path):
+    """Verify that an interrupted save keeps the previous file."""
+    path = tmp_path / "sum" / "data.pickle"
+    save_atomically(path, [1, 2])
+    with patch("pickle.dump", side_effect=Interrupt), pytest.raises(Interrupt):
+        save_atomically(path, [3])
+    assert pickle.loads(path.read_bytes()) == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "executor_class,size",
+    [(BranchAndBoundExecutor, 22), (BruteForceExecutor, 18)],
+)
+def test_executor_resumes_from_checkpoint(
+    executor_class: type[AbstractExecutor], size: int, tmp_path: Path
+):
+    """Verify that an interrupted calculation resumes where it stopped.
+
+    The first target is solved, and the second one is interrupted in
+    the middle of its search. The resumed calculation must report
+    fewer batches than a full one and keep the result of the first
+    target. The odd target can never be reached by the even numbers.
+    """
+    date = datetime.date(2020, 1, 1)
+    numbers = [Summons(f"n{i}", date, 2 * i + 2) for i in range(size)]
+    odd = sum([x.amount for x in numbers]) // 2 | 1
+    targets = [Summons("solved", date, 4), Summons("odd", date, odd)]
+    full_callback = MagicMock()
+    executor_class().calculate_all(targets, numbers, full_callback)
+    store = CheckpointStore(tmp_path / "checkpoint.pickle", interval=0.0)
+    calls = 0
+
+    def interrupt(progress: float):
+        nonlocal calls
+        calls += 1
+        if calls == full_callback.call_count // 2:
+            raise Interrupt()
+
+    with pytest.raises(Interrupt):
+        executor_class(checkpoint=store).calculate_all(
+            targets, numbers, interrupt
+        )
+    assert store.path.exists()
+    mock_callback = MagicMock()
+    results = executor_class(checkpoint=store).calculate_all(
+        targets, numbers, mock_callback
+    )
+    assert [x.amount for x in results[0].subset] == [4]
+    assert results[1].subset is None
+    assert mock_callback.call_count < full_callback.call_count - 2
+    assert mock_callback.call_args[0][0] == 1.0
+    assert not store.path.exists()
@@ -0,0 +1,229 @@
+import json
+from io import StringIO
+from pathlib import Path
+from typing import Optional
+
+import openpyxl
+import pytest
+from openpyxl import Workbook
+
+from src.cli import main, run_batch
+
+
+def _write_workbook(
+    path: Path,
+    targets: list[int],
+    numbers: list[int],
+    dates: Optional[list[str]] = None,
+):
+    """Write a workbook in the layout ExcelDataLoader reads.
+
+    dates gives the date of every target and then every number, in the
+    form of "20240411", or 20240411 for all of them if None.
+    """
+    dates = dates or ["20240411"] * (len(targets) + len(numbers))
+    workbook = Workbook()
+    sheet = workbook.active
+    for i, amount in enumerate(targets):
+        sheet.cell(i + 1, 1, amount)
+    sheet = workbook.create_sheet("worksheet 2")
+    for i, amount in enumerate(targets + numbers):
+        sheet.cell(i + 1, 1, f"{dates[i]}-5256-{i:06d}")
+        sheet.cell(i + 1, 2, amount)
+    workbook.save(path)
+
+
+def test_run_batch(tmp_path: Path):
+    """Verify that run_batch calculates and reports every workbook."""
+    files = []
+    for i in range(2):
+        files.append(tmp_path / f"ledger{i}.xlsx")
+        _write_workbook(files[-1], [10, 100], [3, 4, 5, 6])
+    stream = StringIO()
+    output_dir = tmp_path / "output"
+    assert run_batch(
+        [str(i) for i in files],
+        "dynamic-programming",
+        workers=2,
+        output_dir=str(output_dir),
+        stream=stream,
+    )
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    done = [event for event in events if event["event"] == "done"]
+    assert sorted(event["file"] for event in done) == sorted(map(str, files))
+    for event in done:
+        assert event["targets"] == 2
+        assert event["solved"] == 1
+        assert event["impossible"] == 1
+        workbook = openpyxl.load_workbook(event["output"])
+        assert workbook.sheetnames[1] == "配對表"
+    assert events[-1]["event"] == "summary"
+    assert events[-1]["done"] == 2
+
+
+def test_run_batch_reports_failures(tmp_path: Path):
+    """Verify that missing workbooks and timeouts are reported.
+
+    The unsolvable target of 40 numbers takes brute force far longer
+    than the timeout.
+    """
+    slow = tmp_path / "slow.xlsx"
+    _write_workbook(slow, [10**6], [1] * 40)
+    missing = tmp_path / "missing.xlsx"
+    stream = StringIO()
+    assert not run_batch(
+        [str(slow), str(missing)],
+        "brute-force",
+        workers=2,
+        timeout=0.5,
+        output_dir=str(tmp_path),
+        stream=stream,
+    )
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    outcome = {
+        event["file"]: event["event"]
+        for event in events
+        if event["event"] in ("done", "error", "timeout")
+    }
+    assert outcome == {str(slow): "timeout", str(missing): "error"}
+
+
+def test_main_rejects_unknown_executor():
+    """Verify that the command line only accepts known executors."""
+    with pytest.raises(SystemExit):
+        main(["ledger.xlsx", "--executor", "unknown"])
+
+
+def test_run_batch_timeout_frees_worker(tmp_path: Path):
+    """Verify that a workbook that times out frees its worker.
+
+    With a single worker, the second workbook only starts once the
+    first one is stopped.
+    """
+    slow = tmp_path / "slow.xlsx"
+    _write_workbook(slow, [10**6], [1] * 40)
+    fast = tmp_path / "fast.xlsx"
+    _write_workbook(fast, [10], [3, 4, 5, 6])
+    stream = StringIO()
+    assert not run_batch(
+        [str(slow), str(fast)],
+        "brute-force",
+        workers=1,
+        timeout=0.5,
+        output_dir=str(tmp_path),
+        stream=stream,
+    )
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    outcome = {
+        event["file"]: event["event"]
+        for event in events
+        if event["event"] in ("done", "error", "timeout")
+    }
+    assert outcome == {str(slow): "timeout", str(fast): "done"}
+
+
+def test_run_batch_rows_layout(tmp_path: Path):
+    """Verify that the rows layout writes a row per matched summons."""
+    workbook = tmp_path / "ledger.xlsx"
+    _write_workbook(workbook, [10], [3, 4, 5, 6])
+    stream = StringIO()
+    assert run_batch(
+        [str(workbook)],
+        "dynamic-programming",
+        workers=1,
+        output_dir=str(tmp_path / "output"),
+        stream=stream,
+        layout="rows",
+    )
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    done = next(event for event in events if event["event"] == "done")
+    sheet = openpyxl.load_workbook(done["output"])["配對表"]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0][4] == "狀態"
+    assert sum(row[3] for row in rows[1:]) == 10
+
+
+def test_run_batch_same_stem(tmp_path: Path):
+    """Verify that workbooks of the same stem get their own outputs.
+
+    The same path given twice and a workbook of the same name in
+    another directory are all calculated and written apart.
+    """
+    first = tmp_path / "ledger.xlsx"
+    _write_workbook(first, [10], [3, 4, 5, 6])
+    (tmp_path / "other").mkdir()
+    second = tmp_path / "other" / "ledger.xlsx"
+    _write_workbook(second, [100], [3, 4, 5, 6])
+    files = [str(first), str(first), str(second)]
+    stream = StringIO()
+    assert run_batch(
+        files,
+        "dynamic-programming",
+        workers=3,
+        output_dir=str(tmp_path / "output"),
+        stream=stream,
+    )
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    done = {
+        event["index"]: event for event in events if event["event"] == "done"
+    }
+    assert sorted(done) == [0, 1, 2]
+    assert [done[i]["file"] for i in range(3)] == files
+    assert len({done[i]["output"] for i in range(3)}) == 3
+    assert [done[i]["solved"] for i in range(3)] == [1, 1, 0]
+    assert events[-1]["done"] == 3
+
+
+@pytest.mark.parametrize(
+    "options,solved", [([], 1), (["--window-before", "1"], 0)]
+)
+def test_main_window(
+    tmp_path: Path, capsys: pytest.CaptureFixture, options, solved
+):
+    """Verify that the date window of the command line is applied.
+
+    The only number that matches the target is dated two days before
+    it, so the target is impossible within a window of one day.
+    """
+    workbook = tmp_path / "ledger.xlsx"
+    _write_workbook(workbook, [10], [10], ["20240411", "20240409"])
+    argv = [str(workbook), "-e", "dynamic-programming", "-w", "1"]
+    main(argv + ["-o", str(tmp_path)] + options)
+    events = [
+        json.loads(line) for line in capsys.readouterr().out.splitlines()
+    ]
+    done = next(event for event in events if event["event"] == "done")
+    assert done["solved"] == solved
+
+
+def test_main_rejects_window_without_support():
+    """Verify that a window is rejected by executors that ignore it."""
+    with pytest.raises(SystemExit):
+        main(["ledger.xlsx", "-e", "bitset", "--window-after", "1"])
+
+
+@pytest.mark.parametrize("order,solved", [("date", 1), ("amount", 2)])
+def test_main_order(
+    tmp_path: Path, capsys: pytest.CaptureFixture, order, solved
+):
+    """Verify that the order of the command line decides the claims.
+
+    The earliest target of 8 takes both numbers by date, while the
+    targets of 3 and 5 take them first by amount.
+    """
+    workbook = tmp_path / "ledger.xlsx"
+    dates = ["20240411", "20240412", "20240413", "20240410", "20240410"]
+    _write_workbook(workbook, [8, 5, 3], [5, 3], dates)
+    argv = [str(workbook), "-e", "dynamic-programming", "-w", "1"]
+    main(argv + ["-o", str(tmp_path), "--order", order])
+    events = [
+        json.loads(line) for line in capsys.readouterr().out.splitlines()
+    ]
+    done = next(event for event in events if event["event"] == "done")
+    assert done["solved"] == solved
+
+
+def test_main_rejects_order_without_support():
+    """Verify that an order is rejected by executors that ignore it."""
+    with pytest.raises(SystemExit):
+        main(["ledger.xlsx", "-e", "bitset", "--order", "amount"])
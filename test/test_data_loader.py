@@ -59,3 +59,28 @@ def test_load():
         assert targets == data_loader.targets
         assert numbers == data_loader.numbers
         assert data_loader._loaded
+
+
+def test_load_duplicate_targets():
+    """Verify that a target amount is matched as often as it is listed.
+
+    Two targets share the amount 5, so only the first two rows with
+    that amount are targets and the third one is a number.
+    """
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.cell(1, 1, 5)
+    sheet.cell(2, 1, 5)
+    workbook.create_sheet("worksheet 2")
+    sheet = workbook["worksheet 2"]
+    accounts = [f"20240411-5256-00000{i}" for i in range(3)]
+    for i, account in enumerate(accounts):
+        sheet.cell(i + 1, 1, account)
+        sheet.cell(i + 1, 2, -5)
+    with BytesIO() as file:
+        workbook.save(file)
+        data_loader = ExcelDataLoader()
+        data_loader.load(file)
+        assert [x.account for x in data_loader.targets] == accounts[:2]
+        assert [x.account for x in data_loader.numbers] == accounts[2:]
+        assert all(x.amount == 5 for x in data_loader.numbers)
@@ -1,27 +1,413 @@
+import datetime
 from unittest.mock import MagicMock
 
 import pytest
 
-from src.executor import BruteForceExecutor
+import src.executor
+from src.data_loader import Summons
+from src.executor import (
+    PROGRESS_BATCH,
+    AbstractExecutor,
+    BitsetExecutor,
+    BranchAndBoundExecutor,
+    BruteForceExecutor,
+    Budget,
+    CandidatePool,
+    DateWindow,
+    DynamicProgrammingExecutor,
+    MeetInTheMiddleExecutor,
+    PlannedExecutor,
+    Status,
+    VectorizedExecutor,
+    order_targets,
+)
 from test.utils import FakeDataLoader
 
+EXECUTORS = [
+    BitsetExecutor,
+    BranchAndBoundExecutor,
+    BruteForceExecutor,
+    DynamicProgrammingExecutor,
+    MeetInTheMiddleExecutor,
+    PlannedExecutor,
+    pytest.param(
+        VectorizedExecutor,
+        marks=pytest.mark.skipif(
+            src.executor.np is None, reason="numpy is not installed"
+        ),
+    ),
+]
 
+
+@pytest.mark.parametrize("executor_class", EXECUTORS)
 @pytest.mark.parametrize("solvable", [(True), (False)])
-def test_executor(solvable: FakeDataLoader):
-    """Verify that BruteForceExecutor successfully solve problem.
+def test_executor(
+    solvable: FakeDataLoader, executor_class: type[AbstractExecutor]
+):
+    """Verify that executors successfully solve problem.
 
     Make sure that callback is called at least once.
     """
     mock_callback = MagicMock()
 
     data_loader = FakeDataLoader(solvable)
-    eva = BruteForceExecutor()
+    eva = executor_class()
     results = eva.calculate_all(
         data_loader.targets, data_loader.numbers, mock_callback
     )
     for i in results:
         if solvable:
             assert sum([x.amount for x in i.subset]) == i.target.amount
+            assert i.status is Status.SOLVED
+        else:
+            assert i.subset is None
+            assert i.status is Status.IMPOSSIBLE
     mock_callback.assert_called()
     args, _ = mock_callback.call_args
     assert isinstance(args[0], float), f"Expected float, got {type(args[0])}"
+
+
+@pytest.mark.parametrize("executor_class", EXECUTORS)
+@pytest.mark.parametrize("amounts", [(12,), (5, 7)])
+def test_executor_uses_all_candidates(
+    executor_class: type[AbstractExecutor], amounts: tuple[int, ...]
+):
+    """Verify that a target matched by all its candidates is solved."""
+    date = datetime.date(2020, 1, 1)
+    target = Summons("target", date, 12)
+    numbers = [
+        Summons(f"n{i}", date, amount) for i, amount in enumerate(amounts)
+    ]
+    result = executor_class().calculate_all([target], numbers)[0]
+    assert result.status is Status.SOLVED
+    assert sorted(i.amount for i in result.subset) == list(amounts)
+
+
+@pytest.mark.parametrize("executor_class", EXECUTORS)
+def test_executor_matches_each_number_once(
+    executor_class: type[AbstractExecutor],
+):
+    """Verify that a summons is never matched to two targets."""
+    data_loader = FakeDataLoader()
+    target = data_loader.targets[0]
+    targets = [
+        Summons(target.account, target.date, amount) for amount in (3, 3, 3)
+    ]
+    numbers = [
+        Summons(f"n{i}", target.date, amount)
+        for i, amount in enumerate((0, 1, 2, 3, 9))
+    ]
+    results = executor_class().calculate_all(targets, numbers)
+    used = [
+        x.account for result in results if result.subset for x in result.subset
+    ]
+    assert len(used) == len(set(used))
+    assert sorted(used) == ["n1", "n2", "n3"]
+    assert [result.subset is None for result in results].count(True) == 1
+
+
+@pytest.mark.parametrize("executor_class", EXECUTORS)
+@pytest.mark.parametrize("amount", [0, -5])
+def test_executor_non_positive_target(
+    executor_class: type[AbstractExecutor], amount: int
+):
+    """Verify that every executor only matches positive amounts.
+
+    A target of 0 or less is impossible, even with summons of 0, and
+    such summons are never matched to a positive target.
+    """
+    date = datetime.date(2020, 1, 1)
+    targets = [Summons("zero", date, amount), Summons("five", date, 5)]
+    numbers = [
+        Summons(f"n{i}", date, number)
+        for i, number in enumerate([0, -5, 5, 0])
+    ]
+    results = executor_class().calculate_all(targets, numbers)
+    assert results[0].subset is None
+    assert results[0].status is Status.IMPOSSIBLE
+    assert [i.account for i in results[1].subset] == ["n2"]
+
+
+def test_candidate_pool():
+    """Verify that CandidatePool removes matched summons."""
+    numbers = FakeDataLoader().numbers
+    pool = CandidatePool(numbers)
+    pool.remove(numbers[2:5])
+    pool.remove(numbers[4:6])
+    assert len(pool) == len(numbers) - 4
+    assert list(pool) == numbers[:2] + numbers[6:]
+
+
+@pytest.mark.parametrize(
+    "order,expected",
+    [("date", [1, 0, 2]), ("amount", [2, 1, 0]), ("difficulty", [2, 1, 0])],
+)
+def test_order_targets(order: str, expected: list[int]):
+    """Verify that order_targets sorts targets by the chosen key."""
+    data_loader = FakeDataLoader()
+    target = data_loader.targets[0]
+    targets = [
+        Summons(target.account, target.date.replace(day=3), 9),
+        Summons(target.account, target.date.replace(day=1), 5),
+        Summons(target.account, target.date.replace(day=5), 2),
+    ]
+    assert order_targets(targets, data_loader.numbers, order) == expected
+
+
+def test_order_targets_unknown():
+    """Verify that an unknown order is rejected."""
+    with pytest.raises(ValueError):
+        BruteForceExecutor(order="unknown")
+
+
+def test_dynamic_programming_executor_uses_each_number_once():
+    """Verify that DynamicProgrammingExecutor never reuses a summons."""
+    data_loader = FakeDataLoader()
+    target = data_loader.targets[0]
+    numbers = [n for n in data_loader.numbers if n.amount in (3, 6)]
+    target.amount = 12
+    result = DynamicProgrammingExecutor().calculate_all([target], numbers)[0]
+    assert result.subset is None
+    target.amount = 9
+    result = DynamicProgrammingExecutor().calculate_all([target], numbers)[0]
+    assert sorted(x.amount for x in result.subset) == [3, 6]
+
+
+def test_vectorized_executor_solves_all_targets():
+    """Verify that VectorizedExecutor solves every target in blocks.
+
+    Use a tiny partial-sum table and block size so that the sums are
+    split across many blocks.
+    """
+    pytest.importorskip("numpy")
+    data_loader = FakeDataLoader()
+    target = data_loader.targets[0]
+    targets = [
+        Summons(target.account, target.date, amount)
+        for amount in (20, 1, 7, 100)
+    ]
+    eva = VectorizedExecutor(low_bits=3, block_size=16)
+    results = eva.calculate_all(targets, data_loader.numbers)
+    assert [result.target for result in results] == targets
+    used = []
+    for result in results:
+        if result.target.amount == 100:
+            assert result.subset is None
+        else:
+            assert (
+                sum([x.amount for x in result.subset]) == result.target.amount
+            )
+            used.extend(map(id, result.subset))
+    assert len(used) == len(set(used))
+
+
+def test_bitset_executor_rebuilds_across_checkpoints():
+    """Verify that BitsetExecutor rebuilds subsets from checkpoints.
+
+    Use a tiny checkpoint interval so that the subsets span several
+    checkpoints.
+    """
+    data_loader = FakeDataLoader()
+    target = data_loader.targets[0]
+    targets = [
+        Summons(target.account, target.date, amount)
+        for amount in (30, 10, 1, 100)
+    ]
+    eva = BitsetExecutor(checkpoint_interval=2)
+    results = eva.calculate_all(targets, data_loader.numbers)
+    assert results[0].subset
+    assert results[3].subset is None
+    used = []
+    for result in results:
+        if result.subset:
+            amounts = [x.amount for x in result.subset]
+            assert sum(amounts) == result.target.amount
+            used.extend(map(id, result.subset))
+    assert len(used) == len(set(used))
+
+
+def test_branch_and_bound_executor_prunes_duplicates():
+    """Verify that BranchAndBoundExecutor skips repeated amounts.
+
+    Without skipping, the 40 equal amounts would expand every one of
+    their combinations before the target is proven unreachable.
+    """
+    data_loader = FakeDataLoader()
+    target = data_loader.targets[0]
+    numbers = [Summons(f"n{i}", target.date, 500) for i in range(40)]
+    numbers.append(Summons("fee", target.date, 30))
+    target.amount = 500 * 20 + 15
+    eva = BranchAndBoundExecutor()
+    assert eva._calculate(target, numbers).subset is None
+    assert eva._already_calculation + eva._pending_calculation < 1000
+    target.amount = 500 * 20 + 30
+    subset = eva.calculate_all([target], numbers)[0].subset
+    assert sum([x.amount for x in subset]) == target.amount
+
+
+def test_executor_reports_progress_in_batches():
+    """Verify that progress is reported once per batch of work.
+
+    The estimate is exact for an unsolvable target, so the last report
+    must be 1.0.
+    """
+    mock_callback = MagicMock()
+    data_loader = FakeDataLoader(solvable=False)
+    target = data_loader.targets[0]
+    numbers = [Summons(f"n{i}", target.date, 1) for i in range(16)]
+    BruteForceExecutor().calculate_all([target], numbers, mock_callback)
+    combinations = 2**16 - 2
+    assert mock_callback.call_count < combinations // PROGRESS_BATCH + 20
+    progress = [args[0] for args, _ in mock_callback.call_args_list]
+    assert progress == sorted(progress)
+    assert progress[-1] == 1.0
+
+
+def test_candidate_pool_between():
+    """Verify that CandidatePool finds the numbers of a date window."""
+    start = datetime.date(2020, 1, 1)
+    numbers = [
+        Summons(f"n{i}", start + datetime.timedelta(days=day), 1)
+        for i, day in enumerate((5, 0, 3, 9, 4))
+    ]
+    pool = CandidatePool(numbers)
+    pool.remove([numbers[4]])
+    window = DateWindow(before=1, after=2).bounds(datetime.date(2020, 1, 5))
+    assert pool.between(*window) == [numbers[0], numbers[2]]
+
+
+@pytest.mark.parametrize(
+    "executor_class",
+    [
+        BranchAndBoundExecutor,
+        BruteForceExecutor,
+        DynamicProgrammingExecutor,
+        PlannedExecutor,
+    ],
+)
+def test_executor_date_window(executor_class: type[AbstractExecutor]):
+    """Verify that a target is only matched within its date window."""
+    start = datetime.date(2020, 1, 1)
+    target = Summons("target", start + datetime.timedelta(days=10), 5)
+    numbers = [
+        Summons("early", start, 5),
+        Summons("a", start + datetime.timedelta(days=8), 2),
+        Summons("b", start + datetime.timedelta(days=11), 3),
+        Summons("c", start + datetime.timedelta(days=10), 4),
+    ]
+    eva = executor_class(window=DateWindow(before=3, after=1))
+    subset = eva.calculate_all([target], numbers)[0].subset
+    assert sorted(x.account for x in subset) == ["a", "b"]
+    eva = executor_class(window=DateWindow(before=1, after=1))
+    assert eva.calculate_all([target], numbers)[0].subset is None
+
+
+@pytest.mark.parametrize(
+    "executor_class",
+    [
+        BranchAndBoundExecutor,
+        BruteForceExecutor,
+        DynamicProgrammingExecutor,
+        MeetInTheMiddleExecutor,
+        PlannedExecutor,
+    ],
+)
+def test_executor_budget(executor_class: type[AbstractExecutor]):
+    """Verify that a target over budget is given up, not the others.
+
+    The odd target can never be reached by even amounts, but none of
+    the executors prove it before the budget runs out.
+    """
+    date = datetime.date(2020, 1, 1)
+    targets = [Summons("hard", date, 301), Summons("easy", date, 6)]
+    numbers = [Summons(f"n{i}", date, 2 * i) for i in range(1, 25)]
+    eva = executor_class(budget=Budget(work=1000))
+    hard, easy = eva.calculate_all(targets, numbers)
+    assert hard.status is Status.EXHAUSTED
+    assert hard.subset is None
+    assert "1000" in hard.reason
+    assert easy.status is Status.SOLVED
+    hard = executor_class(budget=Budget(seconds=0)).calculate_all(
+        targets, numbers
+    )[0]
+    assert hard.status is Status.EXHAUSTED
+    assert "seconds" in hard.reason
+
+
+@pytest.mark.parametrize(
+    "amounts,target,max_cells,expected",
+    [
+        ([1, 2, 4, 8], 10**9, 1 << 26, BruteForceExecutor),
+        (
+            [i % 20 + 1 for i in range(40)],
+            100,
+            2000,
+            DynamicProgrammingExecutor,
+        ),
+        (
+            [10**6 + i for i in range(30)],
+            10**7,
+            1 << 26,
+            MeetInTheMiddleExecutor,
+        ),
+        ([500] * 40 + [30], 500 * 20 + 30, 1 << 26, BranchAndBoundExecutor),
+        ([i % 20 + 1 for i in range(40)], 100, 1000, BranchAndBoundExecutor),
+    ],
+)
+def test_planned_executor_plan(
+    amounts: list[int],
+    target: int,
+    max_cells: int,
+    expected: type[AbstractExecutor],
+):
+    """Verify that PlannedExecutor picks the cheapest strategy.
+
+    The tables of a target may hold max_cells divided by 10 cores, so
+    the table of DynamicProgrammingExecutor no longer fits into 1000.
+    """
+    date = datetime.date(2020, 1, 1)
+    numbers = [
+        Summons(f"n{i}", date, amount) for i, amount in enumerate(amounts)
+    ]
+    eva = PlannedExecutor(cores=10, max_cells=max_cells)
+    strategy, _ = eva.plan(Summons("target", date, target), numbers)
+    assert type(strategy) is expected
+
+
+def test_branch_and_bound_executor_iter_matches():
+    """Verify that every distinct subset of every target is yielded.
+
+    Swapping equal amounts is not a new subset, and the targets do not
+    take summons from each other.
+    """
+    date = datetime.date(2020, 1, 1)
+    targets = [Summons("t0", date, 1000), Summons("t1", date, 7)]
+    numbers = [
+        Summons(f"n{i}", date, amount)
+        for i, amount in enumerate((500, 500, 500, 1000, 300, 200))
+    ]
+    matches = list(BranchAndBoundExecutor().iter_matches(targets, numbers))
+    subsets = [
+        sorted(x.amount for x in result.subset)
+        for result in matches
+        if result.target is targets[0]
+    ]
+    assert sorted(subsets) == [[200, 300, 500], [500, 500], [1000]]
+    assert matches[-1].target is targets[1]
+    assert matches[-1].status is Status.IMPOSSIBLE
+    limited = BranchAndBoundExecutor().iter_matches(targets, numbers, 2)
+    assert [result.target for result in limited] == [targets[0]] * 2 + [
+        targets[1]
+    ]
+
+
+def test_branch_and_bound_executor_iter_matches_budget():
+    """Verify that the enumeration of a target stops with its budget."""
+    date = datetime.date(2020, 1, 1)
+    targets = [Summons("t0", date, 200)]
+    numbers = [Summons(f"n{i}", date, i) for i in range(1, 41)]
+    eva = BranchAndBoundExecutor(budget=Budget(work=PROGRESS_BATCH * 4))
+    matches = list(eva.iter_matches(targets, numbers))
+    assert len(matches) > 1
+    assert matches[-1].status is Status.EXHAUSTED
+    assert all(result.subset for result in matches[:-1])
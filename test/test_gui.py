@@ -4,15 +4,26 @@ from unittest.mock import patch
 
 import pytest
 
+from src.cache import CachedSubprocessManager, ResultCache
 from src.data_loader import Summons
-from src.executor import BruteForceExecutor, Result
-from src.gui import GUI
-from src.subprocess import SubprocessManager
+from src.executor import (
+    BruteForceExecutor,
+    DateWindow,
+    PlannedExecutor,
+    Result,
+)
+from src.gui import GUI, run_gui
+from src.subprocess import (
+    ParallelSubprocessManager,
+    ScheduledSubprocessManager,
+    SubprocessManager,
+)
 from test.utils import (
     FakeDataLoader,
     FakeSubprocessManager,
     ImmediateSubprocessManager,
     InfiniteExecutor,
+    SynchronousSubprocessManager,
 )
 
 
@@ -165,6 +176,24 @@ def test_save_file(filename: str | None, gui_instance_fake_manager: GUI):
         assert gui_instance_fake_manager.button.cget("text") == "選擇檔案"
 
 
+def test_save_file_rows(gui_instance_fake_manager: GUI):
+    """Test that save_file writes the row layout when it is chosen."""
+    results = [
+        Result(
+            Summons("test", datetime.date(2020, 1, 1), 1),
+            [Summons("test", datetime.date(2020, 1, 1), 1)],
+        )
+    ]
+    gui_instance_fake_manager.rows_var.set(True)
+    with patch(
+        "tkinter.filedialog.asksaveasfilename", return_value="test.xlsx"
+    ), patch("src.gui.stream_output_excel") as mock_stream_output_excel:
+        gui_instance_fake_manager.save_file(results)
+        mock_stream_output_excel.assert_called_once_with(
+            results, gui_instance_fake_manager.data_loader, "test.xlsx"
+        )
+
+
 def test_save_file_failure(gui_instance_fake_manager: GUI):
     """Test the save_file method of the GUI when it fails."""
     error_message = "Simulated Save File Error"
@@ -194,6 +223,29 @@ def test_run_action(gui_instance_immediate: GUI):
         )
 
 
+def test_run_action_cached(tmp_path: Path):
+    """Test the run_action method when every target is cached.
+
+    The second run is answered from the cache, and the GUI must still
+    end in the done state rather than be left running.
+    """
+    manager = CachedSubprocessManager(
+        SynchronousSubprocessManager(),
+        ResultCache(tmp_path / "cache.sqlite3"),
+    )
+    for gui in _create_gui_instance(
+        FakeDataLoader(), BruteForceExecutor(), manager, 0.0
+    ):
+        with patch("src.gui.GUI.open_file", return_value="test.xlsx"), patch(
+            "src.gui.GUI.ask_save_filename", return_value="result.xlsx"
+        ), patch("src.gui.output_excel"):
+            gui.run_action()
+            gui.run_action()
+        assert manager.manager.targets == []
+        assert gui.label_var.get().startswith("結果已經寫入 result.xlsx")
+        assert gui.button.cget("text") == "選擇檔案"
+
+
 @pytest.mark.parametrize(
     "target,base_error_message",
     [
@@ -265,3 +317,76 @@ def test_stop_action_failure(
         mock_handle_error.assert_called_once_with(
             f"{base_error_message}{error_message}"
         )
+
+
+def test_run_action_enumeration(gui_instance_fake_manager: GUI):
+    """Test the run_action method of the GUI when listing all matches.
+
+    The matches are written while they are searched, so the output file
+    is chosen before the enumeration starts.
+    """
+    gui_instance_fake_manager.enumerate_var.set(True)
+    with patch("src.gui.GUI.open_file", return_value="test.xlsx"), patch(
+        "tkinter.filedialog.asksaveasfilename", return_value="matches.xlsx"
+    ), patch.object(
+        gui_instance_fake_manager.manager, "start_enumeration"
+    ) as mock_start_enumeration:
+        gui_instance_fake_manager.run_action()
+        args = mock_start_enumeration.call_args[0]
+        assert args[4] == "matches.xlsx"
+        args[6](3)
+        assert (
+            "已將 3 組配對寫入 matches.xlsx"
+            in gui_instance_fake_manager.label_var.get()
+        )
+
+
+def test_run_action_window(gui_instance_fake_manager: GUI):
+    """Test that the date window of the GUI reaches the executors."""
+    gui_instance_fake_manager.before_var.set("1")
+    gui_instance_fake_manager.after_var.set("2")
+    with patch("src.gui.GUI.open_file", return_value="test.xlsx"):
+        gui_instance_fake_manager.run_action()
+    assert gui_instance_fake_manager.executor.window == DateWindow(1, 2)
+    assert gui_instance_fake_manager.enumerator.window == DateWindow(1, 2)
+    gui_instance_fake_manager.stop_action()
+    gui_instance_fake_manager.before_var.set("")
+    gui_instance_fake_manager.after_var.set("")
+    with patch("src.gui.GUI.open_file", return_value="test.xlsx"):
+        gui_instance_fake_manager.run_action()
+    assert gui_instance_fake_manager.executor.window is None
+
+
+@pytest.mark.parametrize(
+    "argv,manager_class,executor_class",
+    [
+        ([], SubprocessManager, PlannedExecutor),
+        (
+            ["--manager", "parallel"],
+            ParallelSubprocessManager,
+            BruteForceExecutor,
+        ),
+        (
+            ["--manager", "scheduled"],
+            ScheduledSubprocessManager,
+            PlannedExecutor,
+        ),
+    ],
+)
+def test_run_gui_manager(argv, manager_class, executor_class):
+    """Test that run_gui calculates with the manager of its arguments.
+
+    The parallel manager only splits brute force, so it comes with a
+    brute force executor.
+    """
+    with patch("src.gui.GUI") as mock_gui, patch("src.gui.ResultCache"), patch(
+        "src.gui.SnapshotStore"
+    ), patch("src.gui.CheckpointStore"):
+        run_gui(argv)
+    _, executor, manager = mock_gui.call_args[0]
+    inner = manager.manager.manager
+    try:
+        assert type(inner) is manager_class
+        assert type(executor) is executor_class
+    finally:
+        inner.terminate()
@@ -0,0 +1,132 @@
+import datetime
+from pathlib import Path
+
+from src.data_loader import Summons
+from src.executor import BruteForceExecutor
+from src.incremental import IncrementalSubprocessManager, SnapshotStore
+from test.utils import FakeDataLoader, SynchronousSubprocessManager
+
+
+def test_incremental_subprocess_manager():
+    """Verify that only affected targets are solved again.
+
+    The ledger is loaded again with an appended summons and target. The
+    matched target keeps its result, the new target is solved, and the
+    appended summons is offered first.
+    """
+    results = None
+
+    def get_results(outcome):
+        nonlocal results
+        results = outcome
+
+    data_loader = FakeDataLoader()
+    inner = SynchronousSubprocessManager()
+    manager = IncrementalSubprocessManager(inner)
+    executor = BruteForceExecutor()
+    manager.start_calculation(
+        executor, data_loader.targets, data_loader.numbers, get_results
+    )
+    first = results[0]
+    reloaded = FakeDataLoader()
+    added = Summons("added", datetime.date(2020, 1, 2), 3)
+    target = Summons("new", datetime.date(2020, 1, 2), 3)
+    targets = reloaded.targets + [target]
+    manager.start_calculation(
+        executor, targets, reloaded.numbers + [added], get_results
+    )
+    assert inner.targets == [target]
+    assert inner.numbers[0] == added
+    assert list(results[0].subset) == list(first.subset)
+    assert results[0].target is reloaded.targets[0]
+    assert list(results[1].subset) == [added]
+
+
+def test_incremental_subprocess_manager_lost_summons():
+    """Verify that a target is solved again if its summons disappear."""
+    results = None
+
+    def get_results(outcome):
+        nonlocal results
+        results = outcome
+
+    data_loader = FakeDataLoader()
+    inner = SynchronousSubprocessManager()
+    manager = IncrementalSubprocessManager(inner)
+    executor = BruteForceExecutor()
+    manager.start_calculation(
+        executor, data_loader.targets, data_loader.numbers, get_results
+    )
+    removed = results[0].subset[0]
+    numbers = [i for i in data_loader.numbers if i != removed]
+    manager.start_calculation(
+        executor, data_loader.targets, numbers, get_results
+    )
+    assert inner.targets == data_loader.targets
+    assert removed not in results[0].subset
+
+
+def test_incremental_subprocess_manager_snapshot(tmp_path: Path):
+    """Verify that the previous run of a workbook survives a restart.
+
+    A new manager with the same store only solves the appended target
+    of the reopened workbook.
+    """
+    results = None
+
+    def get_results(outcome):
+        nonlocal results
+        results = outcome
+
+    store = SnapshotStore(tmp_path / "snapshot.pickle")
+    workbook = str(tmp_path / "ledger.xlsx")
+    data_loader = FakeDataLoader()
+    executor = BruteForceExecutor()
+    manager = IncrementalSubprocessManager(
+        SynchronousSubprocessManager(), store
+    )
+    manager.open_workbook(workbook)
+    manager.start_calculation(
+        executor, data_loader.targets, data_loader.numbers, get_results
+    )
+    first = results[0]
+    inner = SynchronousSubprocessManager()
+    manager = IncrementalSubprocessManager(inner, store)
+    manager.open_workbook(workbook)
+    reloaded = FakeDataLoader()
+    target = Summons("new", datetime.date(2020, 1, 2), 3)
+    manager.start_calculation(
+        executor, reloaded.targets + [target], reloaded.numbers, get_results
+    )
+    assert inner.targets == [target]
+    assert list(results[0].subset) == list(first.subset)
+    manager.open_workbook(str(tmp_path / "other.xlsx"))
+    assert not manager.previous_results
+
+
+def test_incremental_subprocess_manager_unchanged():
+    """Verify that an unchanged rerun still goes through the manager.
+
+    The wrapped manager decides when the callback runs, even if it has
+    no target to solve.
+    """
+    results = None
+
+    def get_results(outcome):
+        nonlocal results
+        results = outcome
+
+    data_loader = FakeDataLoader()
+    inner = SynchronousSubprocessManager()
+    manager = IncrementalSubprocessManager(inner)
+    executor = BruteForceExecutor()
+    manager.start_calculation(
+        executor, data_loader.targets, data_loader.numbers, get_results
+    )
+    first = results
+    results = None
+    manager.start_calculation(
+        executor, data_loader.targets, data_loader.numbers, get_results
+    )
+    assert inner.targets == []
+    assert [i.subset for i in results] == [i.subset for i in first]
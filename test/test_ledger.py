@@ -0,0 +1,97 @@
+import datetime
+import multiprocessing
+import pickle
+import sys
+from multiprocessing import resource_tracker
+from unittest.mock import patch
+
+from src.data_loader import Summons
+from src.ledger import CompactLedger, SharedLedger, untrack_attachments
+
+
+def _numbers(count: int) -> list[Summons]:
+    start = datetime.date(2024, 4, 11)
+    return [
+        Summons(
+            f"20240411-5256-{i % 7:06d}",
+            start + datetime.timedelta(days=i % 5),
+            i * 10,
+        )
+        for i in range(count)
+    ]
+
+
+def test_compact_ledger():
+    """Verify that CompactLedger returns the original summons."""
+    numbers = _numbers(20)
+    ledger = CompactLedger(numbers)
+    assert len(ledger) == 20
+    assert list(ledger.amounts) == [i.amount for i in numbers]
+    assert len(ledger.accounts) == 7
+    subset = ledger.materialize([3, 5])
+    assert subset[0] is numbers[3]
+    assert subset[1] is numbers[5]
+
+
+def test_compact_ledger_pickle():
+    """Verify that a pickled CompactLedger is small and builds Summons.
+
+    The unpickled ledger no longer has the original summons, so it
+    builds equal ones from its arrays.
+    """
+    numbers = _numbers(1000)
+    data = pickle.dumps(CompactLedger(numbers))
+    assert len(data) < len(pickle.dumps(numbers)) / 2
+    ledger = pickle.loads(data)
+    assert ledger.materialize(range(1000)) == numbers
+
+
+def test_summons_slots():
+    """Verify that Summons keeps no instance dictionary."""
+    assert not hasattr(_numbers(1)[0], "__dict__")
+
+
+def _total(shared: SharedLedger) -> tuple[int, Summons]:
+    """Sum the amounts of a shared ledger. Use as a child process."""
+    ledger = shared.attach()
+    return sum(ledger.amounts), ledger.summons(len(ledger) - 1)
+
+
+def test_shared_ledger():
+    """Verify that workers attach to a SharedLedger by its name."""
+    numbers = _numbers(1000)
+    shared = SharedLedger(CompactLedger(numbers))
+    try:
+        assert len(pickle.dumps(shared)) < 200
+        with multiprocessing.Pool(2) as pool:
+            outcome = pool.map(_total, [shared] * 4)
+        total = sum(i.amount for i in numbers)
+        assert outcome == [(total, numbers[-1])] * 4
+        ledger = shared.attach()
+        assert ledger.materialize(range(1000)) == numbers
+    finally:
+        shared.unlink()
+
+
+def _registrations(shared: SharedLedger) -> int:
+    """Count the registrations of attaching. Use as a child process."""
+    with patch.object(resource_tracker, "register") as register:
+        shared.attach()
+    return register.call_count
+
+
+def test_shared_ledger_untracked():
+    """Verify that workers leave the memory to the tracker of the owner.
+
+    A worker that registered the memory would make the tracker unlink
+    it once more, or report it as leaked. The owner is no worker, so
+    it opens the memory as usual, which only Python 3.13 can do without
+    registering.
+    """
+    shared = SharedLedger(CompactLedger(_numbers(10)))
+    try:
+        with multiprocessing.Pool(1, untrack_attachments) as pool:
+            assert pool.apply(_registrations, (shared,)) == 0
+        assert _registrations(shared) == (sys.version_info < (3, 13))
+    finally:
+        shared.unlink()
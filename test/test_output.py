@@ -4,8 +4,18 @@ from itertools import zip_longest
 import openpyxl
 
 from src.data_loader import Summons
-from src.executor import BruteForceExecutor
-from src.output import output_excel
+from src.executor import (
+    BranchAndBoundExecutor,
+    BruteForceExecutor,
+    Result,
+    Status,
+)
+from src.output import (
+    STATUS_LABELS,
+    output_excel,
+    stream_matches_excel,
+    stream_output_excel,
+)
 from test.utils import FakeDataLoader
 
 
@@ -37,6 +47,7 @@ def test_output_excel():
             assert (
                 sheet.cell(2, start_column + 1).value == result.target.amount
             )
+            assert sheet.cell(3, start_column).value == "已配對"
             for i, number in enumerate(result.subset, start=2):
                 assert (
                     sheet.cell(
@@ -49,3 +60,60 @@ def test_output_excel():
                     sheet.cell(i, start_column + 3, number.amount).value
                     == number.amount
                 )
+
+
+def test_stream_output_excel():
+    """Verify that stream_output_excel writes one row per summons."""
+    data_loader = FakeDataLoader()
+    results = BruteForceExecutor().calculate_all(
+        data_loader.targets, data_loader.numbers
+    )
+    results.append(Result(data_loader.targets[0], None))
+    results.append(
+        Result(data_loader.targets[0], None, Status.EXHAUSTED, "timeout")
+    )
+    with BytesIO() as file:
+        stream_output_excel(results, data_loader, file)
+        workbook = openpyxl.load_workbook(file)
+        sheet = workbook[workbook.sheetnames[0]]
+        for row, target, number in zip_longest(
+            sheet.iter_rows(min_row=2, values_only=True),
+            data_loader.targets,
+            data_loader.numbers,
+        ):
+            if target:
+                assert target == Summons(row[0], target.date, row[1])
+            if number:
+                assert number == Summons(row[3], number.date, row[4])
+        sheet = workbook[workbook.sheetnames[1]]
+        expected = []
+        for result in results:
+            target = (result.target.account, result.target.amount)
+            status = (STATUS_LABELS[result.status], result.reason or None)
+            if not result.subset:
+                expected.append(target + (None, None) + status)
+            for number in result.subset or []:
+                expected.append(
+                    target + (number.account, number.amount) + status
+                )
+        assert list(sheet.iter_rows(min_row=2, values_only=True)) == expected
+
+
+def test_stream_matches_excel():
+    """Verify that stream_matches_excel numbers every match."""
+    data_loader = FakeDataLoader()
+    target = data_loader.targets[0]
+    matches = BranchAndBoundExecutor().iter_matches(
+        [target, Summons("none", target.date, 100)], data_loader.numbers
+    )
+    counts = []
+    with BytesIO() as file:
+        count = stream_matches_excel(matches, data_loader, file, counts.append)
+        workbook = openpyxl.load_workbook(file)
+    rows = list(workbook["配對表"].iter_rows(min_row=2, values_only=True))
+    assert counts == list(range(1, count + 1))
+    assert max(row[2] for row in rows if row[2]) == count
+    for index in range(1, count + 1):
+        amounts = [row[4] for row in rows if row[2] == index]
+        assert sum(amounts) == target.amount
+    assert rows[-1] == ("none", 100, None, None, None, "無解", None)
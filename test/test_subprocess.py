@@ -1,11 +1,26 @@
+import asyncio
 import multiprocessing
-import queue
-from unittest.mock import Mock
+from pathlib import Path
+from unittest.mock import Mock, patch
 
 import pytest
 
-from src.executor import BruteForceExecutor
-from src.subprocess import SubprocessManager, _calculate
+from src.checkpoint import CheckpointStore
+from src.data_loader import Summons
+from src.executor import (
+    BranchAndBoundExecutor,
+    BruteForceExecutor,
+    PlannedExecutor,
+)
+from src.subprocess import (
+    AsyncSubprocessManager,
+    Cancelled,
+    ParallelSubprocessManager,
+    ScheduledSubprocessManager,
+    SubprocessManager,
+    _calculate,
+    _init_worker,
+)
 from test.utils import ExceptionExecutor, FakeDataLoader, InfiniteExecutor
 
 
@@ -16,13 +31,26 @@ def manager_instance():
     manager.terminate()
 
 
+@pytest.fixture
+def parallel_manager_instance():
+    manager = ParallelSubprocessManager()
+    yield manager
+    manager.terminate()
+
+
 def test_calculate():
     """Test the _calculate function."""
-    queue = multiprocessing.Queue()
+    progress = multiprocessing.Value("d", 0.0, lock=False)
     executor = BruteForceExecutor()
     data_loader = FakeDataLoader()
-    _calculate(executor, queue, data_loader.targets, data_loader.numbers, -1.0)
-    assert not queue.empty()
+    # The test process is no worker, so it keeps tracking attachments.
+    with patch("src.subprocess.untrack_attachments"):
+        _init_worker(progress)
+        try:
+            _calculate(executor, data_loader.targets, data_loader.numbers)
+        finally:
+            _init_worker(None)
+    assert progress.value > 0
 
 
 def test_start_calculation(manager_instance: SubprocessManager):
@@ -43,6 +71,7 @@ def test_start_calculation(manager_instance: SubprocessManager):
     while manager_instance.is_running():
         pass
     assert results
+    assert manager_instance.update_status() > 0
 
 
 def test_start_calculation_error(manager_instance: SubprocessManager):
@@ -84,11 +113,52 @@ def test_stop_calculation(manager_instance: SubprocessManager):
     assert not manager_instance.is_running()
 
 
+def test_stop_calculation_keeps_pool(manager_instance: SubprocessManager):
+    """Verify that a stopped calculation frees its worker for reuse.
+
+    The stopped calculation is cancelled at its next report, and none
+    of its callbacks are called.
+    """
+    pool = manager_instance.pool
+    callback = Mock()
+    error_callback = Mock()
+    data_loader = FakeDataLoader()
+    manager_instance.start_calculation(
+        InfiniteExecutor(),
+        data_loader.targets,
+        data_loader.numbers,
+        callback,
+        error_callback,
+    )
+    while manager_instance.update_status() != 0.5:
+        pass
+    async_result = manager_instance.async_result
+    manager_instance.stop_calculation()
+    with pytest.raises(Cancelled):
+        async_result.get(timeout=10)
+    results = None
+
+    def get_results(outcome):
+        nonlocal results
+        results = outcome
+
+    manager_instance.start_calculation(
+        BruteForceExecutor(),
+        data_loader.targets,
+        data_loader.numbers,
+        get_results,
+    )
+    manager_instance.async_result.wait(timeout=10)
+    assert results
+    assert manager_instance.pool is pool
+    callback.assert_not_called()
+    error_callback.assert_not_called()
+
+
 def test_update_status(manager_instance: SubprocessManager):
     """Test the update_status method of the SubprocessManager."""
-    manager_instance.queue = Mock()
     expected_progress = 0.5
-    manager_instance.queue.get_nowait.return_value = expected_progress
+    manager_instance.progress.value = expected_progress
     progress = manager_instance.update_status()
     assert progress == expected_progress
 
@@ -96,10 +166,376 @@ def test_update_status(manager_instance: SubprocessManager):
 def test_update_status_empty(manager_instance: SubprocessManager):
     """Test update_status method of SubprocessManager.
 
-    Test when the queue is empty.
+    Test when no calculation has reported yet.
     """
-    manager_instance.queue = Mock()
-    exception = queue.Empty
-    manager_instance.queue.get_nowait.side_effect = exception
-    progress = manager_instance.update_status()
-    assert progress is None
+    assert not manager_instance.update_status()
+
+
+@pytest.mark.parametrize("solvable", [(True), (False)])
+def test_parallel_start_calculation(
+    solvable: bool, parallel_manager_instance: ParallelSubprocessManager
+):
+    """Test start_calculation method of ParallelSubprocessManager."""
+    results = None
+
+    def get_results(outcome):
+        nonlocal results
+        results = outcome
+
+    data_loader = FakeDataLoader(solvable)
+    parallel_manager_instance.start_calculation(
+        BruteForceExecutor(),
+        data_loader.targets,
+        data_loader.numbers,
+        get_results,
+        interval=-1.0,
+    )
+    while parallel_manager_instance.is_running():
+        pass
+    assert len(results) == len(data_loader.targets)
+    for result in results:
+        if solvable:
+            assert sum([x.amount for x in result.subset]) == (
+                result.target.amount
+            )
+        else:
+            assert result.subset is None
+    progress = parallel_manager_instance.update_status()
+    assert isinstance(progress, float)
+    assert 0 < progress <= 1
+
+
+def test_parallel_rejects_executor(
+    parallel_manager_instance: ParallelSubprocessManager,
+):
+    """Verify that only brute force is split over the workers."""
+    data_loader = FakeDataLoader()
+    with pytest.raises(TypeError, match="BranchAndBoundExecutor"):
+        parallel_manager_instance.start_calculation(
+            BranchAndBoundExecutor(),
+            data_loader.targets,
+            data_loader.numbers,
+        )
+    assert not parallel_manager_instance.is_running()
+
+
+def test_parallel_drains_tasks(
+    parallel_manager_instance: ParallelSubprocessManager,
+):
+    """Verify that no task of a solved target is left in the pool.
+
+    The subset of every target is found among the smallest sizes, so
+    most tasks of the larger sizes are still queued at the hit.
+    """
+    data_loader = FakeDataLoader()
+    target = data_loader.targets[0]
+    numbers = [
+        Summons(target.account, target.date, amount) for amount in range(1, 23)
+    ]
+    targets = [
+        Summons(target.account, target.date, amount) for amount in (3, 5)
+    ]
+    manager = parallel_manager_instance
+    for index, target in enumerate(targets):
+        result = manager._search_target(
+            BruteForceExecutor(), index, target, numbers, 1.0
+        )
+        assert sum(i.amount for i in result.subset) == target.amount
+        assert not manager.pool._cache
+
+
+def test_parallel_stop_calculation(
+    parallel_manager_instance: ParallelSubprocessManager,
+):
+    """Test stop_calculation method of ParallelSubprocessManager.
+
+    Use a target that takes far too long to search.
+    """
+    callback = Mock()
+    data_loader = FakeDataLoader(solvable=False)
+    target = data_loader.targets[0]
+    numbers = [
+        Summons(target.account, target.date, amount) for amount in range(30)
+    ]
+    target.amount = sum(range(30)) + 1
+    parallel_manager_instance.start_calculation(
+        BruteForceExecutor(),
+        data_loader.targets,
+        numbers,
+        callback,
+    )
+    parallel_manager_instance.stop_calculation()
+    assert not parallel_manager_instance.is_running()
+    callback.assert_not_called()
+
+
+def test_scheduled_start_calculation():
+    """Test start_calculation method of ScheduledSubprocessManager.
+
+    The two targets can only both be solved if the second one does not
+    reuse the summons of the first one.
+    """
+    results = None
+
+    def get_results(outcome):
+        nonlocal results
+        results = outcome
+
+    data_loader = FakeDataLoader()
+    target = data_loader.targets[0]
+    targets = [
+        Summons(target.account, target.date, amount) for amount in (3, 3, 50)
+    ]
+    numbers = [Summons(f"n{i}", target.date, i) for i in (0, 1, 2, 3)]
+    manager = ScheduledSubprocessManager()
+    try:
+        manager.start_calculation(
+            BruteForceExecutor(), targets, numbers, get_results
+        )
+        while manager.is_running():
+            pass
+    finally:
+        manager.terminate()
+    assert [result.target for result in results] == targets
+    assert results[2].subset is None
+    used = [x.account for result in results[:2] for x in result.subset]
+    assert sorted(used) == ["n1", "n2", "n3"]
+
+
+def test_scheduled_ignores_checkpoint(tmp_path: Path):
+    """Verify that the tasks of the scheduled manager skip checkpoints.
+
+    A task that used the checkpoint of the executor would clear it once
+    done, while the other tasks still save to it.
+    """
+    results = None
+
+    def get_results(outcome):
+        nonlocal results
+        results = outcome
+
+    checkpoint = CheckpointStore(tmp_path / "checkpoint.pickle")
+    checkpoint.save("other", {})
+    executor = PlannedExecutor(checkpoint=checkpoint)
+    data_loader = FakeDataLoader()
+    manager = ScheduledSubprocessManager()
+    try:
+        manager.start_calculation(
+            executor, data_loader.targets, data_loader.numbers, get_results
+        )
+        while manager.is_running():
+            pass
+    finally:
+        manager.terminate()
+    assert checkpoint.path.exists()
+    assert executor.checkpoint is checkpoint
+    for result in results:
+        assert sum(x.amount for x in result.subset) == result.target.amount
+
+
+def test_start_enumeration(
+    manager_instance: SubprocessManager, tmp_path: Path
+):
+    """Test the start_enumeration method of the SubprocessManager."""
+    count = None
+
+    def get_count(outcome):
+        nonlocal count
+        count = outcome
+
+    data_loader = FakeDataLoader()
+    filename = tmp_path / "matches.xlsx"
+    manager_instance.start_enumeration(
+        BranchAndBoundExecutor(),
+        data_loader.targets,
+        data_loader.numbers,
+        data_loader,
+        str(filename),
+        callback=get_count,
+    )
+    while manager_instance.is_running():
+        pass
+    assert count > 1
+    assert filename.exists()
+
+
+def test_stop_enumeration(manager_instance: SubprocessManager, tmp_path: Path):
+    """Verify that a stopped enumeration frees its worker.
+
+    The target is odd and every amount is even, so the search would
+    run far longer than the test.
+    """
+    data_loader = FakeDataLoader(solvable=False)
+    target = data_loader.targets[0]
+    numbers = [
+        Summons(target.account, target.date, 2 * amount)
+        for amount in range(1, 41)
+    ]
+    target.amount = sum(range(1, 41)) + 1
+    manager_instance.start_enumeration(
+        BranchAndBoundExecutor(),
+        [target],
+        numbers,
+        data_loader,
+        str(tmp_path / "matches.xlsx"),
+    )
+    while not manager_instance.update_status():
+        pass
+    async_result = manager_instance.async_result
+    manager_instance.stop_calculation()
+    with pytest.raises(Cancelled):
+        async_result.get(timeout=10)
+
+
+def test_async_run():
+    """Verify that AsyncSubprocessManager runs concurrent calculations.
+
+    The Results are the same as those of the executor itself.
+    """
+    data_loader = FakeDataLoader()
+    executor = BruteForceExecutor()
+    expected = executor.calculate_all(data_loader.targets, data_loader.numbers)
+    manager = AsyncSubprocessManager(max_workers=2)
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                manager.run(executor, data_loader.targets, data_loader.numbers)
+                for _ in range(3)
+            )
+        )
+
+    try:
+        outcomes = asyncio.run(main())
+    finally:
+        manager.terminate()
+    for results in outcomes:
+        assert [i.target for i in results] == data_loader.targets
+        assert [i.subset for i in results] == [i.subset for i in expected]
+        for result in results:
+            for number in result.subset or []:
+                assert any(number is i for i in data_loader.numbers)
+
+
+def test_async_stream_cancel():
+    """Verify that leaving a stream early cancels its calculation.
+
+    The stream is left once the worker reports. The worker gives up at
+    its next report and can run the next calculation.
+    """
+    data_loader = FakeDataLoader()
+    manager = AsyncSubprocessManager(max_workers=1)
+
+    async def main():
+        stream = manager.stream(
+            InfiniteExecutor(),
+            data_loader.targets,
+            data_loader.numbers,
+            interval=0.01,
+        )
+        # The worker may not have started by the first samples.
+        async for progress in stream:
+            if progress >= 0.5:
+                break
+        await stream.aclose()
+        return await manager.run(
+            BruteForceExecutor(), data_loader.targets, data_loader.numbers
+        )
+
+    try:
+        results = asyncio.run(asyncio.wait_for(main(), timeout=10))
+    finally:
+        manager.terminate()
+    assert len(results) == len(data_loader.targets)
+
+
+def test_async_start_calculation():
+    """Verify the callbacks of the async start_calculation."""
+    data_loader = FakeDataLoader()
+    manager = AsyncSubprocessManager(max_workers=1)
+    callback = Mock()
+    error_callback = Mock()
+
+    async def main():
+        manager.start_calculation(
+            BruteForceExecutor(),
+            data_loader.targets,
+            data_loader.numbers,
+            callback,
+            error_callback,
+        )
+        assert manager.is_running()
+        await manager.task
+        manager.start_calculation(
+            ExceptionExecutor(),
+            data_loader.targets,
+            data_loader.numbers,
+            callback,
+            error_callback,
+        )
+        with pytest.raises(ValueError):
+            await manager.task
+
+    try:
+        asyncio.run(main())
+    finally:
+        manager.terminate()
+    callback.assert_called_once()
+    error_callback.assert_called_once()
+
+
+def test_parallel_start_enumeration(
+    parallel_manager_instance: ParallelSubprocessManager, tmp_path: Path
+):
+    """Test start_enumeration method of ParallelSubprocessManager."""
+    callback = Mock()
+    error_callback = Mock()
+    data_loader = FakeDataLoader()
+    filename = tmp_path / "matches.xlsx"
+    parallel_manager_instance.start_enumeration(
+        BranchAndBoundExecutor(),
+        data_loader.targets,
+        data_loader.numbers,
+        data_loader,
+        str(filename),
+        None,
+        callback,
+        error_callback,
+        1.0,
+    )
+    while parallel_manager_instance.is_running():
+        pass
+    error_callback.assert_not_called()
+    assert callback.call_args[0][0] > 1
+    assert filename.exists()
+
+
+def test_async_start_enumeration(tmp_path: Path):
+    """Verify that the async start_enumeration writes the matches."""
+    data_loader = FakeDataLoader()
+    filename = tmp_path / "matches.xlsx"
+    manager = AsyncSubprocessManager(max_workers=1)
+    callback = Mock()
+    error_callback = Mock()
+
+    async def main():
+        manager.start_enumeration(
+            BranchAndBoundExecutor(),
+            data_loader.targets,
+            data_loader.numbers,
+            data_loader,
+            str(filename),
+            None,
+            callback,
+            error_callback,
+        )
+        assert manager.is_running()
+        await manager.task
+
+    try:
+        asyncio.run(main())
+    finally:
+        manager.terminate()
+    error_callback.assert_not_called()
+    assert callback.call_args[0][0] > 1
+    assert filename.exists()
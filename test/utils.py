@@ -1,9 +1,10 @@
 import datetime
 import time
-from typing import Callable
+from typing import Callable, Optional
 
 from src.data_loader import AbstractDataLoader, Summons
-from src.executor import AbstractExecutor, Result
+from src.executor import AbstractExecutor, BranchAndBoundExecutor, Result
+from src.output import stream_matches_excel
 from src.subprocess import AbstractSubprocessManager
 
 
@@ -119,6 +120,20 @@ class FakeSubprocessManager(AbstractSubprocessManager):
     ):
         pass
 
+    def start_enumeration(
+        self,
+        executor: BranchAndBoundExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        data_loader: AbstractDataLoader,
+        filename: str,
+        limit: Optional[int],
+        callback: Callable[[int], None],
+        error_callback: Callable[[Exception], None],
+        interval: float,
+    ):
+        pass
+
     def stop_calculation(self):
         pass
 
@@ -161,6 +176,78 @@ class ImmediateSubprocessManager(AbstractSubprocessManager):
     ):
         callback(self.results)
 
+    def start_enumeration(
+        self,
+        executor: BranchAndBoundExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        data_loader: AbstractDataLoader,
+        filename: str,
+        limit: Optional[int],
+        callback: Callable[[int], None],
+        error_callback: Callable[[Exception], None],
+        interval: float,
+    ):
+        callback(0)
+
+    def stop_calculation(self):
+        pass
+
+    def update_status(self):
+        pass
+
+
+class SynchronousSubprocessManager(AbstractSubprocessManager):
+    """A fake subprocess manager that calculates in the caller.
+
+    This manager runs the executor directly when the calculation
+    starts, and remembers the targets and numbers it was asked for.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.targets = None
+        self.numbers = None
+
+    def is_running(self) -> bool:
+        return False
+
+    def terminate(self):
+        pass
+
+    def start_calculation(
+        self,
+        executor: AbstractExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        callback: Callable[[list[Result]], None],
+        error_callback: Callable[[Exception], None],
+        interval: float,
+    ):
+        self.targets = targets
+        self.numbers = numbers
+        callback(executor.calculate_all(targets, numbers))
+
+    def start_enumeration(
+        self,
+        executor: BranchAndBoundExecutor,
+        targets: list[Summons],
+        numbers: list[Summons],
+        data_loader: AbstractDataLoader,
+        filename: str,
+        limit: Optional[int],
+        callback: Callable[[int], None],
+        error_callback: Callable[[Exception], None],
+        interval: float,
+    ):
+        callback(
+            stream_matches_excel(
+                executor.iter_matches(targets, numbers, limit),
+                data_loader,
+                filename,
+            )
+        )
+
     def stop_calculation(self):
         pass
 